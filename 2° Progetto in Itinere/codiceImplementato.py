@@ -90,10 +90,9 @@ def backToFather(self, rootID):
         # Ottengo i due elementi medi nella lista
         primoElemento = percorso[int(len(percorso) / 2) - 1]
         secondoElemento = percorso[int(len(percorso) / 2)]
-        self.deleteEdge(primoElemento, secondoElemento)
-        self.deleteEdge(secondoElemento, primoElemento)
-        first = self.calculateSubNode(primoElemento)  # Numero di nodi figli del primo elemento
-        second = self.calculateSubNode(secondoElemento)  # Numero di nodi figli del secondo elemento
+        # Conto i nodi dei due sottoalberi ignorando l'arco tra i due nodi, senza eliminarlo dal grafo
+        first = self.calculateSubNode(primoElemento, secondoElemento)  # Numero di nodi figli del primo elemento
+        second = self.calculateSubNode(secondoElemento, primoElemento)  # Numero di nodi figli del secondo elemento
         # Confronto il numero di elementi appartenenti ai sottoalberi ottenuti dai due elementi
         if first < second:
             nodeList = [[secondoElemento], second]
@@ -108,10 +107,12 @@ def backToFather(self, rootID):
     return nodeList
 
 
-def calculateSubNode(self, rootId):
+def calculateSubNode(self, rootId, escluso=None):
     """
     Questa funzione, dato un grafo e l'Id di un suo nodo, mi restituisce il numero di nodi raggiungibili a partire dal nodo
+    senza attraversare l'arco tra il nodo ed il nodo escluso (come se l'arco fosse stato eliminato)
     :param rootId: Id del nodo
+    :param escluso: Id del nodo adiacente da non raggiungere direttamente (opzionale)
     :return: Numero di elementi che posso raggiungere a partire dal nodo
     """
     # Utilizzo l'algoritmo per la visita generica visto a lezione
@@ -127,6 +128,8 @@ def calculateSubNode(self, rootId):
         treeNode = vertexSet.pop()
         adjacentNodes = self.getAdj(treeNode.info)
         for nodeIndex in adjacentNodes:
+            if treeNode.info == rootId and nodeIndex == escluso:  # Salto l'arco ignorato
+                continue
             if nodeIndex not in markedNodes:
                 counter = counter + 1  # Incremento il contatore
                 newTreeNode = TreeNode(nodeIndex)
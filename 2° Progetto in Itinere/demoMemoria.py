@@ -0,0 +1,61 @@
+"""
+    File name: demoMemoria.py
+    Python Version: 3.6.3
+
+    Questo modulo misura l'occupazione di memoria (byte per elemento) dei tipi elementari usati dalle strutture dati:
+    nodi ed archi dei grafi, record delle liste, nodi degli alberi e della union-find.
+    Termina con un errore se uno dei tipi torna ad avere un __dict__ per istanza o supera il limite di memoria fissato.
+"""
+
+import tracemalloc
+
+from graphFile.base import Node, Edge
+from list.LinkedList import Record
+from list.DoubleLinkedList import DoubleRecord
+from tree.binaryTree import BinaryNode
+from tree.treeArrayList import TreeArrayListNode
+from unionFind.UnionFind_QuickFind import UnionFindNode
+
+NUM_ELEMENTI = 100000
+
+# Limite di byte per elemento (l'oggetto e le liste create dal costruttore, esclusi i valori contenuti)
+LIMITI = [
+    ("Node", lambda i: Node(i, i), 64),
+    ("Edge", lambda i: Edge(i, i, None), 64),
+    ("Record", lambda i: Record(i), 56),
+    ("DoubleRecord", lambda i: DoubleRecord(i), 64),
+    ("BinaryNode", lambda i: BinaryNode(i), 72),
+    ("TreeArrayListNode", lambda i: TreeArrayListNode(i), 128),
+    ("UnionFindNode", lambda i: UnionFindNode(i), 120),
+]
+
+
+def byteElemento(crea, numElementi=NUM_ELEMENTI):
+    """
+    Questa funzione crea numElementi oggetti e restituisce la memoria media allocata per ciascuno di essi.
+
+    :param crea: funzione che, dato un intero, crea un elemento
+    :param numElementi: numero di elementi da creare
+    :return: byte allocati per elemento
+    """
+    valori = list(range(numElementi))  # I valori sono creati prima della misura
+    tracemalloc.start()
+    prima = tracemalloc.get_traced_memory()[0]
+    elementi = [crea(i) for i in valori]
+    dopo = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    contenitore = 8 * len(elementi)  # Puntatori della lista che contiene gli elementi
+    return (dopo - prima - contenitore) / numElementi
+
+
+if __name__ == "__main__":
+    errori = []
+    for nome, crea, limite in LIMITI:
+        byte = byteElemento(crea)
+        haDict = hasattr(crea(0), "__dict__")
+        print("{:>18}: {:6.1f} byte per elemento{}".format(nome, byte, " (con __dict__)" if haDict else ""))
+        if haDict or byte > limite:
+            errori.append(nome)
+
+    if len(errori) > 0:
+        raise SystemExit("Regressione di memoria: " + ", ".join(errori))
@@ -1,10 +1,15 @@
 from abc import ABCMeta, abstractmethod
+from array import array
+from contextlib import contextmanager
+from itertools import repeat
 
 from graphFile.base import Node
+from graphFile.stats import GraphStats
 from tree.treeArrayList import TreeArrayListNode as TreeNode
 from tree.treeArrayList import TreeArrayList as Tree
 from queue.Queue import CodaArrayList_deque as Queue
 from stack.Stack import PilaArrayList as Stack
+import operator
 import random
 
 
@@ -139,12 +144,21 @@ class GraphBase(Graph, metaclass=ABCMeta):
     The basic graph data structure (abstract).
     """
 
-    def __init__(self):
+    def __init__(self, undirected=False):
         """
         Constructor.
+        :param undirected: if True, each edge is stored once and it is
+        visible from both its endpoints; otherwise, edges are directed.
         """
         self.nodes = {}  # dictionary {nodeId: node}
         self.nextId = 0  # the next node ID to be assigned
+        self.undirected = undirected  # True if each edge (u,v) is also (v,u)
+        self.degrees = None  # {nodeId: degree}, only if the degree index is enabled
+        self.degreeBuckets = None  # {degree: set of nodeIds}, idem
+        self.stats = None  # GraphStats, only if the instrumentation is enabled
+        self.version = 0  # incremented on every change of the nodes or of the edges
+        self.changes = None  # change log of the open batch, only inside batch()
+        self.components = None  # (version, connected components), cached by componentView
 
     def isEmpty(self):
         """
@@ -272,11 +286,257 @@ class GraphBase(Graph, metaclass=ABCMeta):
         """
         ...
 
-    def mediumNode(self):
+    def enableDegreeIndex(self):
+        """
+        Build the degree index, which keeps the nodes grouped by degree and
+        is updated on every node/edge mutation.
+        :return: void.
+        """
+        self.degrees = {}
+        self.degreeBuckets = {}
+        for nodeId in self.nodes:
+            degree = self.deg(nodeId)
+            self.degrees[nodeId] = degree
+            self.degreeBuckets.setdefault(degree, set()).add(nodeId)
+
+    def disableDegreeIndex(self):
+        """
+        Drop the degree index.
+        :return: void.
+        """
+        self.degrees = None
+        self.degreeBuckets = None
+
+    def _nodeAdded(self, nodeId):
+        """
+        Update the degree index after a node has been added.
+        :param nodeId: the node ID (integer).
+        :return: void.
+        """
+        self.version += 1
+        if self.degrees is None:
+            return
+        self._nodeRemoved(nodeId)  # a node added twice replaces the old one
+        self.degrees[nodeId] = 0
+        self.degreeBuckets.setdefault(0, set()).add(nodeId)
+
+    def _nodeRemoved(self, nodeId):
+        """
+        Update the degree index after a node has been removed.
+        :param nodeId: the node ID (integer).
+        :return: void.
+        """
+        self.version += 1
+        if self.degrees is None or nodeId not in self.degrees:
+            return
+        bucket = self.degreeBuckets[self.degrees.pop(nodeId)]
+        bucket.discard(nodeId)
+
+    def _degreeChanged(self, nodeId, delta):
+        """
+        Update the degree index after the degree of a node has changed.
+        :param nodeId: the node ID (integer).
+        :param delta: the degree variation.
+        :return: void.
+        """
+        self.version += 1
+        if self.degrees is None or nodeId not in self.degrees:
+            return
+        degree = self.degrees[nodeId]
+        self.degreeBuckets[degree].discard(nodeId)
+        degree += delta
+        self.degrees[nodeId] = degree
+        self.degreeBuckets.setdefault(degree, set()).add(nodeId)
+
+    def nodesWithDegree(self, degree):
+        """
+        Return the IDs of the nodes with the specified degree.
+        It takes O(1) per returned node if the degree index is enabled;
+        O(|V|) deg() calls, otherwise.
+        :param degree: the degree.
+        :return: the list of node IDs.
+        """
+        if self.degrees is None:
+            return [nodeId for nodeId in self.nodes if self.deg(nodeId) == degree]
+        return list(self.degreeBuckets.get(degree, ()))
+
+    def leaves(self):
+        """
+        Return the IDs of the nodes with degree 1.
+        :return: the list of node IDs.
+        """
+        return self.nodesWithDegree(1)
+
+    def isolated(self):
+        """
+        Return the IDs of the nodes with degree 0.
+        :return: the list of node IDs.
+        """
+        return self.nodesWithDegree(0)
+
+    # methods timed as phases when the instrumentation is enabled
+    INSTRUMENTED_PHASES = ("findLeaf", "leafDistance", "backToFather", "calculateSubNode",
+                           "genericSearch", "bfs", "dfs", "_bfsDistances")
+
+    def enableStats(self, callback=None):
+        """
+        Enable the instrumentation: getAdj calls and the phases of mediumNode
+        and of the traversals are counted and timed in a GraphStats object.
+        The instrumented methods are wrapped on this instance only, so a graph
+        without instrumentation pays no overhead (but one check per search:
+        the searches that build an exploration tree count its nodes).
+        :param callback: the (optional) function called as callback(phase,
+        elapsed) every time a phase ends.
+        :return: the GraphStats object.
+        """
+        if self.stats is not None:
+            self.disableStats()
+        stats = GraphStats(callback)
+
+        getAdj = self.getAdj
+        def countedGetAdj(nodeId):
+            result = getAdj(nodeId)
+            stats.getAdjCalls += 1
+            stats.touchedNodes.add(nodeId)
+            stats.edgesTouched += len(result)
+            return result
+        self.getAdj = countedGetAdj
+
+        def timed(phase, method):
+            def timedMethod(*args, **kwargs):
+                start = stats.now()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    stats.endPhase(phase, start)
+            return timedMethod
+
+        for phase in GraphBase.INSTRUMENTED_PHASES:
+            setattr(self, phase, timed(phase, getattr(self, phase)))
+        self.stats = stats
+        return stats
+
+    def disableStats(self):
+        """
+        Disable the instrumentation, restoring the original methods.
+        :return: the GraphStats object with the collected counters, or None.
+        """
+        stats = self.stats
+        for name in GraphBase.INSTRUMENTED_PHASES + ("getAdj",):
+            self.__dict__.pop(name, None)
+        self.stats = None
+        return stats
+
+    # mutations recorded in the change log inside batch()
+    BATCHED_MUTATIONS = ("addNode", "deleteNode", "insertEdge", "deleteEdge")
+    ADD_NODE, DELETE_NODE, INSERT_EDGE, DELETE_EDGE = range(4)
+
+    @contextmanager
+    def batch(self):
+        """
+        Group many mutations in a transaction:
+
+            with graph.batch():
+                graph.insertEdge(0, 1)
+                graph.deleteNode(2)
+
+        Inside the block addNode, deleteNode, insertEdge and deleteEdge are
+        only recorded in a compact change log (the graph is not changed yet,
+        and they return None). At the end of the block the log is applied in
+        a single pass, in the order of the calls, with the same result of the
+        calls made outside a batch (no operation is merged or reordered). The
+        degree index, if enabled, is rebuilt once instead of being updated by
+        every call, and the version is incremented once. If the block raises an
+        exception, the log is discarded and the graph is left unchanged.
+        A batch opened inside another batch joins the outer one.
+        ---
+        Time Complexity: O(number of changes), plus the cost of applying the
+        changes and of rebuilding the degree index
+        :return: the graph.
+        """
+        if self.changes is not None:  # nested batch
+            yield self
+            return
+
+        # change log: operation code, tail (or node ID), head, weight (or node value)
+        changes = self.changes = [bytearray(), array('q'), array('q'), []]
+        operations, tails, heads, values = changes
+
+        def record(operation, tail, head=-1, value=None):
+            operations.append(operation)
+            tails.append(tail)
+            heads.append(head)
+            values.append(value)
+
+        self.addNode = lambda elem: record(GraphBase.ADD_NODE, -1, -1, elem)
+        self.deleteNode = lambda nodeId: record(GraphBase.DELETE_NODE, nodeId)
+        self.insertEdge = lambda tail, head, weight=None: record(GraphBase.INSERT_EDGE, tail, head, weight)
+        self.deleteEdge = lambda tail, head: record(GraphBase.DELETE_EDGE, tail, head)
+        try:
+            yield self
+        finally:
+            for name in GraphBase.BATCHED_MUTATIONS:
+                self.__dict__.pop(name, None)
+            self.changes = None
+        self._applyChanges(changes)
+
+    def _applyChanges(self, changes):
+        """
+        Apply a change log recorded by batch() to the graph.
+        :param changes: the change log [operations, tails, heads, values].
+        :return: void.
+        """
+        operations, tails, heads, values = changes
+        if len(operations) == 0:
+            return
+
+        # the per-call maintenance of the degree index is replaced by a rebuild
+        indexed = self.degrees is not None
+        self.disableDegreeIndex()
+        version = self.version
+        try:
+            for i in range(len(operations)):
+                operation = operations[i]
+                if operation == GraphBase.ADD_NODE:
+                    self.addNode(values[i])
+                elif operation == GraphBase.DELETE_NODE:
+                    self.deleteNode(tails[i])
+                elif operation == GraphBase.INSERT_EDGE:
+                    self.insertEdge(tails[i], heads[i], values[i])
+                else:
+                    self.deleteEdge(tails[i], heads[i])
+        finally:
+            self.version = version + 1
+            if indexed:
+                self.enableDegreeIndex()
+
+    def freeze(self):
+        """
+        Return a frozen (read-only) CSR copy of the graph, that can be
+        published in shared memory (see GraphCSR.publish).
+        :return: the frozen graph.
+        """
+        from graphFile.Graph_CSR import GraphCSR
+        return GraphCSR.fromGraph(self)
+
+    def pagerank(self, damping=0.85, tol=1e-6, maxIter=100):
+        """
+        Compute the PageRank of the nodes on the frozen copy of the graph
+        (see GraphCSR.pagerank).
+        :param damping: the probability of following an edge.
+        :param tol: the convergence threshold on the L1 norm of the change.
+        :param maxIter: the maximum number of iterations.
+        :return: the dictionary {nodeId: rank}.
+        """
+        return self.freeze().pagerank(damping, tol, maxIter)
+
+    def mediumNode(self, dedup=False):
         """
         Questa funzione, dato un grafo, restituisce una lista contenente la lista dei nodi massimi ed il numero di volte
         che risultano medi all'interno del grafo.
 
+        :param dedup: se True, i percorsi sono calcolati una sola volta per ogni classe di alberi isomorfi (vedi
+        _percorsiDeduplicati)
         :return: restituisco il nodo che risulta massimo nel grafo
         """
 
@@ -284,25 +544,35 @@ class GraphBase(Graph, metaclass=ABCMeta):
         nodeMax = [[], 0]  # Informazioni sul nodo che risulta medio il maggior numero di volte
         nodiMedi = []  # Lista dei nodi che sono risultati medi
         percorsi = []  # Lista dei percorsi più lunghi nei vari sotto-grafi
+        stats = self.stats  # Se diverso da None, misuro i tempi delle fasi
 
-        for nodo in (self.getNodes()):  # Considero ogni nodo
-            if (self.getAdjModified(nodo.id) != 0):  # Se il nodo ha almeno un nodo adiacente,
-                nodi.append(nodo.id)  # lo aggiungo alla lista dei nodi da visitare
-
-        while (len(nodi) > 0):  # Fin quando ho nodi da di visitare
-            percorso = self.findLeaf(random.choice(nodi))  # Ottengo il percorso più lungo nel grafo
-            for fogliaProfonda in percorso[
-                1]:  # Nel caso in cui all'interno di un sotto-grafo siano presenti più foglie con la stessa lunghezza del percorso
-                if (fogliaProfonda != 0):  # Se esiste un percorso,
-                    nodoMassimo = self.backToFather(fogliaProfonda)  # calcolo il valore del(dei) nodo massimo(massimi)
-                    if (
-                                nodoMassimo != 0):  # Verifico se la funzione ha restituito effettivamente una lista contenente i nodi medi
-                        percorsi = percorsi + [nodoMassimo]  # Aggiungo il percorso alla lista
-                        nodiMedi = nodiMedi + nodoMassimo[0]  # Aggiungo i nodi medi alla lista
-
-            nodi = list(
-                set(nodi) - set(
-                    percorso[2]))  # Rimuovo dalla lista dei nodi quelli appartenenti al sottografo considerato
+        inizio = stats.now() if stats is not None else None
+        if self.degrees is not None:  # Se l'indice dei gradi è attivo, scarto le foglie ed i nodi isolati senza visitarli
+            for grado, bucket in self.degreeBuckets.items():
+                if grado > 1:
+                    nodi.extend(bucket)
+        else:
+            for nodo in (self.getNodes()):  # Considero ogni nodo
+                if (self.deg(nodo.id) > 1):  # Se il nodo ha almeno due nodi adiacenti,
+                    nodi.append(nodo.id)  # lo aggiungo alla lista dei nodi da visitare
+        if stats is not None:
+            stats.endPhase("candidates", inizio)
+
+        if dedup:
+            percorsi = self._percorsiDeduplicati(nodi)
+        else:
+            while (len(nodi) > 0):  # Fin quando ho nodi da di visitare
+                percorsiComponente, visitati = self._percorsiComponente(random.choice(nodi))
+                percorsi = percorsi + percorsiComponente  # Aggiungo i percorsi alla lista
+                inizio = stats.now() if stats is not None else None
+                nodi = list(
+                    set(nodi) - set(
+                        visitati))  # Rimuovo dalla lista dei nodi quelli appartenenti al sottografo considerato
+                if stats is not None:
+                    stats.endPhase("difference", inizio)
+
+        for percorso in percorsi:
+            nodiMedi = nodiMedi + percorso[0]  # Aggiungo i nodi medi alla lista
 
         # Se presenti duplicati, li rimuovo dalla lista dei nodi medi
         nodiMedi = list(set(nodiMedi))
@@ -327,6 +597,127 @@ class GraphBase(Graph, metaclass=ABCMeta):
         nodeMax[0] = list(set(nodeMax[0]))  # Rimuovo, se presenti, i nodi considerati più volte
         return nodeMax[0]  # Restituisco il nodo massimo e le volte che risulta massimo nel grafo
 
+    def _percorsiComponente(self, rootId):
+        """
+        Questa funzione, dato l'id di un nodo, calcola i percorsi più lunghi del sottografo che lo contiene e, per ognuno,
+        il(i) nodo(i) medio(i) restituito(i) da backToFather.
+
+        :param rootId: Id del nodo da cui far partire la visita
+        :return: lista dei risultati di backToFather ([[nodi medi], contatore]) e lista dei nodi visitati
+        """
+        percorsi = []
+        percorso = self.findLeaf(rootId)  # Ottengo il percorso più lungo nel grafo
+        for fogliaProfonda in percorso[
+            1]:  # Nel caso in cui all'interno di un sotto-grafo siano presenti più foglie con la stessa lunghezza del percorso
+            if (fogliaProfonda != 0):  # Se esiste un percorso,
+                nodoMassimo = self.backToFather(fogliaProfonda)  # calcolo il valore del(dei) nodo massimo(massimi)
+                if (
+                        nodoMassimo != 0):  # Verifico se la funzione ha restituito effettivamente una lista contenente i nodi medi
+                    percorsi.append(nodoMassimo)  # Aggiungo il percorso alla lista
+        return percorsi, percorso[2]
+
+    def _percorsiDeduplicati(self, nodi):
+        """
+        Questa funzione calcola i risultati di _percorsiComponente per tutti i sottografi che contengono i nodi indicati,
+        visitando un solo albero per ogni classe di alberi isomorfi. La classe di un albero è data dalla sua forma
+        canonica (codifica AHU radicata nel centro); i risultati del rappresentante sono riportati sugli altri alberi
+        della classe tramite l'ordine canonico dei nodi. I sottografi che non sono alberi sono visitati singolarmente.
+
+        :param nodi: lista degli Id dei nodi da considerare
+        :return: lista dei risultati di backToFather ([[nodi medi], contatore])
+        """
+        etichette = {}  # Etichette AHU condivise tra i vari alberi {tupla delle etichette dei figli: etichetta}
+        classi = {}  # {forma canonica: risultati del rappresentante, espressi come posizioni nell'ordine canonico}
+        percorsi = []
+        candidati = set(nodi)
+
+        while len(candidati) > 0:
+            rootId = candidati.pop()
+            visitati, forma, ordine = self._formaCanonica(rootId, etichette)
+            candidati.difference_update(visitati)
+
+            if forma is None:  # Il sottografo non è un albero: lo visito normalmente
+                percorsi = percorsi + self._percorsiComponente(rootId)[0]
+                continue
+
+            if forma not in classi:  # Primo albero della classe: calcolo i risultati e li salvo per posizione
+                posizione = {nodeId: i for i, nodeId in enumerate(ordine)}
+                classi[forma] = [[[posizione[nodeId] for nodeId in medi], contatore]
+                                 for medi, contatore in self._percorsiComponente(rootId)[0]]
+
+            # Riporto i risultati della classe sui nodi di questo albero
+            for medi, contatore in classi[forma]:
+                percorsi.append([[ordine[i] for i in medi], contatore])
+
+        return percorsi
+
+    def _formaCanonica(self, rootId, etichette):
+        """
+        Questa funzione, dato l'id di un nodo, calcola la forma canonica dell'albero che lo contiene: l'albero viene
+        radicato nel suo centro (trovato eliminando le foglie a strati) ed ogni nodo riceve un'etichetta AHU, ovvero un
+        intero che identifica la tupla ordinata delle etichette dei figli.
+
+        :param rootId: Id del nodo
+        :param etichette: dizionario delle etichette AHU, condiviso tra gli alberi da confrontare
+        :return: lista dei nodi visitati, forma canonica (None se il sottografo non è un albero) e lista dei nodi
+        nell'ordine canonico (visita in profondità con i figli ordinati per etichetta)
+        """
+        visitati = self._bfsDistances(rootId)[0]
+        adiacenti = {nodeId: self.getAdj(nodeId) for nodeId in visitati}
+        if sum(len(adj) for adj in adiacenti.values()) != 2 * (len(visitati) - 1):
+            return visitati, None, None  # Il sottografo contiene cicli
+        insiemi = {nodeId: set(adj) for nodeId, adj in adiacenti.items()}
+        for nodeId, adj in adiacenti.items():
+            for vicino in adj:
+                if vicino == nodeId or vicino not in insiemi or nodeId not in insiemi[vicino]:
+                    return visitati, None, None  # Archi non simmetrici (o cappi): non è un albero
+
+        # Elimino le foglie a strati fino a raggiungere il centro (o i due centri)
+        grado = {nodeId: len(adiacenti[nodeId]) for nodeId in visitati}
+        strato = [nodeId for nodeId in visitati if grado[nodeId] <= 1]
+        rimasti = len(visitati)
+        while rimasti > 2:
+            if len(strato) == 0:  # Nessuna foglia da eliminare: il sottografo non è un albero
+                return visitati, None, None
+            rimasti -= len(strato)
+            prossimo = []
+            for foglia in strato:
+                for vicino in adiacenti[foglia]:
+                    grado[vicino] -= 1
+                    if grado[vicino] == 1:
+                        prossimo.append(vicino)
+            strato = prossimo
+        centri = strato
+
+        # Etichette AHU: ogni centro è la radice della sua metà dell'albero
+        etichetta = {}
+        padre = {centro: None for centro in centri}
+        figli = {}
+        for centro in centri:
+            ordine = [centro]
+            for nodeId in ordine:  # Visita in ampiezza: la lista cresce durante il ciclo
+                figli[nodeId] = [vicino for vicino in adiacenti[nodeId] if vicino not in padre]
+                for figlio in figli[nodeId]:
+                    padre[figlio] = nodeId
+                    ordine.append(figlio)
+            for nodeId in reversed(ordine):
+                figli[nodeId].sort(key=etichetta.__getitem__)
+                chiave = tuple(etichetta[figlio] for figlio in figli[nodeId])
+                etichetta[nodeId] = etichette.setdefault(chiave, len(etichette))
+
+        centri.sort(key=etichetta.__getitem__)
+        forma = tuple(etichetta[centro] for centro in centri)
+
+        # Ordine canonico: visita in profondità con i figli in ordine di etichetta
+        ordine = []
+        for centro in centri:
+            pila = [centro]
+            while len(pila) > 0:
+                nodeId = pila.pop()
+                ordine.append(nodeId)
+                pila.extend(reversed(figli[nodeId]))
+        return visitati, forma, ordine
+
     def backToFather(self, rootID):
         """
         Questa funzione, dato un grafo ed il percorso più lungo all'interno di un suo sottografo, restituisce una lista contenente l'Id
@@ -350,10 +741,9 @@ class GraphBase(Graph, metaclass=ABCMeta):
             # Ottengo i due elementi medi nella lista
             primoElemento = percorso[int(len(percorso) / 2) - 1]
             secondoElemento = percorso[int(len(percorso) / 2)]
-            self.deleteEdge(primoElemento, secondoElemento) # Elimino gli archi tra i due nodi
-            self.deleteEdge(secondoElemento, primoElemento) # ...
-            first = self.calculateSubNode(primoElemento)  # Numero di nodi figli del primo elemento
-            second = self.calculateSubNode(secondoElemento)  # Numero di nodi figli del secondo elemento
+            # Conto i nodi dei due sottoalberi ignorando l'arco tra i due nodi, senza eliminarlo dal grafo
+            first = self.calculateSubNode(primoElemento, secondoElemento)  # Numero di nodi figli del primo elemento
+            second = self.calculateSubNode(secondoElemento, primoElemento)  # Numero di nodi figli del secondo elemento
             # Confronto il numero di elementi appartenenti ai sottoalberi ottenuti dai due elementi
             if second > first:
                 nodeList = [[secondoElemento], second]
@@ -367,10 +757,12 @@ class GraphBase(Graph, metaclass=ABCMeta):
 
         return nodeList
 
-    def calculateSubNode(self, rootId):
+    def calculateSubNode(self, rootId, escluso=None):
         """
         Questa funzione, dato un grafo e l'Id di un suo nodo, mi restituisce il numero di nodi raggiungibili a partire dal nodo
+        senza attraversare l'arco tra il nodo ed il nodo escluso (come se l'arco fosse stato eliminato)
         :param rootId: Id del nodo
+        :param escluso: Id del nodo adiacente da non raggiungere direttamente (opzionale)
         :return: Numero di elementi che posso raggiungere a partire dal nodo
         """
         # Utilizzo l'algoritmo per la visita generica visto a lezione
@@ -386,11 +778,15 @@ class GraphBase(Graph, metaclass=ABCMeta):
             treeNode = vertexSet.pop()
             adjacentNodes = self.getAdj(treeNode.info)
             for nodeIndex in adjacentNodes:
+                if treeNode.info == rootId and nodeIndex == escluso:  # Salto l'arco ignorato
+                    continue
                 if nodeIndex not in markedNodes:
                     counter = counter + 1  # Incremento il contatore
                     newTreeNode = TreeNode(nodeIndex)
                     vertexSet.add(newTreeNode)
                     markedNodes.add(nodeIndex)
+        if self.stats is not None:
+            self.stats.treeNodes += len(markedNodes)  # Un nodo dell'albero per ogni nodo marcato
         return counter
 
     def findLeaf(self, rootId):
@@ -445,6 +841,8 @@ class GraphBase(Graph, metaclass=ABCMeta):
                     markedNodes.append(nodeIndex)
 
         max[2] = markedNodes  # In max[2] avrò la lista dei nodi visitati durante la visita
+        if self.stats is not None:
+            self.stats.treeNodes += len(markedNodes)  # Un nodo dell'albero per ogni nodo marcato
         return max
 
     def leafDistance(self, rootId):
@@ -495,8 +893,621 @@ class GraphBase(Graph, metaclass=ABCMeta):
                     vertexSet.add(newTreeNode)
                     markedNodes.append(nodeIndex)
 
+        if self.stats is not None:
+            self.stats.treeNodes += len(markedNodes)  # Un nodo dell'albero per ogni nodo marcato
         return lunghezzaPercorso  # Restituisco la lista con i valori
 
+    def _bfsDistances(self, rootId):
+        """
+        Execute a BFS from the specified node, computing the distances.
+        :param rootId: the root node ID (integer).
+        :return: the list of reached nodes in BFS order, the dictionary
+        {nodeId: distance} and the dictionary {nodeId: father}.
+        """
+        order = [rootId]
+        distance = {rootId: 0}
+        father = {rootId: None}
+
+        q = Queue()
+        q.enqueue(rootId)
+        while not q.isEmpty():
+            node = q.dequeue()
+            for adj_node in self.getAdj(node):
+                if adj_node not in distance:
+                    distance[adj_node] = distance[node] + 1
+                    father[adj_node] = node
+                    order.append(adj_node)
+                    q.enqueue(adj_node)
+        return order, distance, father
+
+    def eccentricities(self):
+        """
+        Compute the eccentricity of every node of a forest, that is the
+        distance from the farthest node of its tree.
+        For each tree, the two endpoints a and b of a diameter are found with
+        two BFS: the eccentricity of a node v is max(d(v,a), d(v,b)).
+        ---
+        Time Complexity: O(|V|+|E|)
+        :return: the dictionary {nodeId: eccentricity}.
+        """
+        eccentricity = {}
+        for nodeId in self.nodes:
+            if nodeId in eccentricity:
+                continue
+            order = self._bfsDistances(nodeId)[0]
+            first = self._bfsDistances(order[-1])  # order[-1] is the farthest node
+            second = self._bfsDistances(first[0][-1])
+            for node in order:
+                eccentricity[node] = max(first[1][node], second[1][node])
+        return eccentricity
+
+    def median(self):
+        """
+        Compute the 1-median of every tree of a forest, that is the node that
+        minimizes the sum of the distances from the other nodes of its tree.
+        The sum is computed for the root of each tree, and then moved from a
+        father f to a son v as sum(v) = sum(f) + n - 2 * size(v), where n is
+        the number of nodes of the tree and size(v) the size of the subtree of v.
+        ---
+        Time Complexity: O(|V|+|E|)
+        :return: a list containing the list of the medians (all the nodes
+        with the minimum sum, for each tree) and the dictionary
+        {nodeId: sum of the distances}.
+        """
+        mediani = []
+        somme = {}
+        for nodeId in self.nodes:
+            if nodeId in somme:
+                continue
+            order, distance, father = self._bfsDistances(nodeId)
+
+            # subtree sizes, visiting the nodes from the deepest ones
+            size = dict.fromkeys(order, 1)
+            for node in reversed(order[1:]):
+                size[father[node]] += size[node]
+
+            somme[nodeId] = sum(distance.values())
+            for node in order[1:]:
+                somme[node] = somme[father[node]] + len(order) - 2 * size[node]
+
+            minimo = min(somme[node] for node in order)
+            mediani.extend(node for node in order if somme[node] == minimo)
+        return [mediani, somme]
+
+    def approxCenter(self, sweeps=2):
+        """
+        Approximate the center, the diameter and the radius of every connected
+        component of a general (possibly cyclic) graph with repeated BFS
+        sweeps. Each sweep visits from a node a, takes the middle node m of
+        the path to the farthest node b and visits from m: ecc(a) is a lower
+        bound of the diameter, ecc(m) is an upper bound of the radius and
+        2*ecc(m) an upper bound of the diameter. The next sweep starts from
+        the node farthest from m.
+        ---
+        Time Complexity: O(sweeps * (|V|+|E|))
+        :param sweeps: the number of sweeps per component (at least 1).
+        :return: a list with an entry [center, eccentricity, [diameterMin,
+        diameterMax], [radiusMin, radiusMax]] for each component, where
+        center is the node with the smallest eccentricity found.
+        """
+        results = []
+        visited = set()
+        for nodeId in self.nodes:
+            if nodeId in visited:
+                continue
+            order, distance = self._bfsDistances(nodeId)[:2]
+            visited.update(order)
+
+            center, centerEcc = nodeId, distance[order[-1]]
+            diameterMin, diameterMax = centerEcc, 2 * centerEcc
+            start = order[-1]
+            for sweep in range(max(1, sweeps)):
+                # first BFS: from start to the farthest node
+                order, distance, father = self._bfsDistances(start)
+                diameterMin = max(diameterMin, distance[order[-1]])
+
+                # the middle node of the path between start and order[-1]
+                middle = order[-1]
+                for step in range(distance[order[-1]] // 2):
+                    middle = father[middle]
+
+                # second BFS: from the middle node
+                order, distance = self._bfsDistances(middle)[:2]
+                if distance[order[-1]] < centerEcc:
+                    center, centerEcc = middle, distance[order[-1]]
+                diameterMax = min(diameterMax, 2 * distance[order[-1]])
+                start = order[-1]
+
+            results.append([center, centerEcc, [diameterMin, diameterMax],
+                            [(diameterMin + 1) // 2, centerEcc]])
+        return results
+
+    def _denseAdjacency(self):
+        """
+        Return the adjacency of the graph in CSR form, with the nodes
+        renumbered 0..n-1: the positions adjacent to the position i are
+        targets[offsets[i]:offsets[i+1]].
+        :return: the list of node IDs by position, the offsets array and the
+        targets array.
+        """
+        ids = list(self.nodes)
+        position = {ids[i]: i for i in range(len(ids))}
+        offsets = array('q', [0])
+        targets = array('q')
+        for nodeId in ids:
+            targets.extend(position[adj_node] for adj_node in self.getAdj(nodeId))
+            offsets.append(len(targets))
+        return ids, offsets, targets
+
+    def _nodeValues(self):
+        """
+        Return the values of the nodes that are not their IDs (the arrays of
+        exportArrays only keep the IDs).
+        :return: the dictionary {nodeId: value}.
+        """
+        values = {}
+        for nodeId in self.nodes:
+            value = self.getNode(nodeId).value
+            if type(value) is not type(nodeId) or value != nodeId:
+                values[nodeId] = value
+        return values
+
+    def exportArrays(self):
+        """
+        Export the graph as flat arrays, in CSR form: the nodes are numbered
+        0..n-1 by position, the positions adjacent to the position i are
+        targets[offsets[i]:offsets[i+1]] and weights holds the weights of the
+        same entries (NaN if missing). In undirected mode, each edge is
+        listed from both its endpoints.
+        The arrays can be loaded by fromArrays() of any backend.
+        ---
+        Time Complexity: O(|V|+|E|)
+        :return: the list [ids, offsets, targets, weights], where ids are the
+        node IDs by position.
+        """
+        ids, offsets, targets = self._denseAdjacency()
+
+        # weights of the edges, looked up by (tail, head)
+        weightOf = {}
+        for edge in self.getEdges():
+            if edge.weight is not None:
+                weightOf[(edge.tail, edge.head)] = edge.weight
+                if self.undirected:
+                    weightOf[(edge.head, edge.tail)] = edge.weight
+
+        weights = array('d', repeat(float('nan'), len(targets)))
+        if len(weightOf) > 0:
+            for i in range(len(ids)):
+                for k in range(offsets[i], offsets[i + 1]):
+                    weight = weightOf.get((ids[i], ids[targets[k]]))
+                    if weight is not None:
+                        weights[k] = weight
+        return [array('q', ids), offsets, targets, weights]
+
+    @classmethod
+    def fromArrays(cls, ids, offsets, targets, weights=None, undirected=False):
+        """
+        Build a graph from the arrays exported by exportArrays().
+        ---
+        Time Complexity: O(|V|+|E|) insertions
+        :param ids: the node IDs by position.
+        :param offsets: the n+1 offsets of the adjacency ranges.
+        :param targets: the adjacent positions.
+        :param weights: the weights of the entries (NaN if missing), or None.
+        :param undirected: if True, the graph is undirected (each edge is
+        listed from both its endpoints).
+        :return: the new graph.
+        """
+        graph = cls(undirected=undirected)
+        for nodeId in ids:
+            graph.addNode(nodeId)
+        for i in range(len(offsets) - 1):
+            for k in range(offsets[i], offsets[i + 1]):
+                j = targets[k]
+                if undirected and j < i:  # already inserted from j
+                    continue
+                weight = None if weights is None or weights[k] != weights[k] else weights[k]
+                graph.insertEdge(ids[i], ids[j], weight)
+        return graph
+
+    def convert(self, backend):
+        """
+        Copy the graph into another backend, through exportArrays(); the
+        node values are copied too.
+        :param backend: the class of the new graph.
+        :return: the new graph.
+        """
+        ids, offsets, targets, weights = self.exportArrays()
+        graph = backend.fromArrays(ids, offsets, targets, weights, self.undirected)
+        values = self._nodeValues()
+        if len(values) > 0:
+            graph._restoreState({"values": values})
+        return graph
+
+    def _pickleState(self):
+        """
+        Return the state of the graph that the arrays of exportArrays() do
+        not keep (see __reduce_ex__).
+        :return: the dictionary of the state.
+        """
+        state = {}
+        values = self._nodeValues()
+        if len(values) > 0:
+            state["values"] = values
+        return state
+
+    def _restoreState(self, state):
+        """
+        Restore the state returned by _pickleState().
+        :param state: the dictionary of the state.
+        :return: void.
+        """
+        for nodeId, value in state.get("values", {}).items():
+            self.getNode(nodeId).value = value
+
+    def __reduce_ex__(self, protocol):
+        """
+        Pickle the graph as the flat arrays of exportArrays(), instead of the
+        Node, Record and Edge objects, plus the state they do not keep (node
+        values and backend settings, see _pickleState). With protocol 5 the
+        arrays are passed as PickleBuffer, so they can be transferred
+        out-of-band.
+        :param protocol: the pickle protocol.
+        :return: the reconstruction function and its arguments.
+        """
+        buffers = self.exportArrays()
+        if protocol >= 5:
+            import pickle
+            buffers = [pickle.PickleBuffer(buffer) for buffer in buffers]
+        else:
+            # memoryviews (e.g. of shared memory) cannot be pickled in-band
+            buffers = [buffer if isinstance(buffer, array) else array(buffer.format, buffer)
+                       for buffer in buffers]
+        return _unpickleGraph, (type(self), self.undirected, self.nextId,
+                                self.degrees is not None) + tuple(buffers) + (self._pickleState(),)
+
+    def stronglyConnectedComponents(self):
+        """
+        Compute the strongly connected components of a directed graph with
+        the Tarjan algorithm, without recursion: the DFS stack keeps, for
+        each open node, the position of the next edge to explore.
+        ---
+        Time Complexity: O(|V|+|E|)
+        :return: the list of components (lists of node IDs), in reverse
+        topological order of the condensation: no edge goes from a component
+        to a following one.
+        """
+        ids, offsets, targets = self._denseAdjacency()
+        numNodes = len(ids)
+        index = array('q', [-1]) * numNodes  # DFS discovery index
+        low = array('q', bytes(8 * numNodes))  # lowest index reachable
+        nextEdge = array('q', offsets[:numNodes])  # next edge to explore
+        onStack = bytearray(numNodes)
+        stack = array('q')  # nodes of the components not yet closed
+        dfs = array('q')  # DFS path
+        components = []
+        counter = 0
+
+        for root in range(numNodes):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            onStack[root] = 1
+            dfs.append(root)
+
+            while len(dfs) > 0:
+                node = dfs[-1]
+                if nextEdge[node] < offsets[node + 1]:
+                    adj_node = targets[nextEdge[node]]
+                    nextEdge[node] += 1
+                    if index[adj_node] == -1:  # tree edge: descend
+                        index[adj_node] = low[adj_node] = counter
+                        counter += 1
+                        stack.append(adj_node)
+                        onStack[adj_node] = 1
+                        dfs.append(adj_node)
+                    elif onStack[adj_node] and index[adj_node] < low[node]:
+                        low[node] = index[adj_node]
+                    continue
+
+                # all the edges explored: close the node
+                dfs.pop()
+                if len(dfs) > 0 and low[node] < low[dfs[-1]]:
+                    low[dfs[-1]] = low[node]
+                if low[node] == index[node]:  # the node is the root of a component
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        onStack[member] = 0
+                        component.append(ids[member])
+                        if member == node:
+                            break
+                    components.append(component)
+        return components
+
+    def condensation(self):
+        """
+        Build the condensation of a directed graph: the DAG with a node for
+        each strongly connected component and an edge between two
+        components if an edge of the graph connects them.
+        The components are numbered 0..k-1 in topological order, so every
+        edge of the DAG goes from a component to a following one.
+        ---
+        Time Complexity: O(|V|+|E|)
+        :return: a list containing the DAG (a directed GraphAdjacencyList),
+        the list of components (lists of node IDs) and the dictionary
+        {nodeId: component}.
+        """
+        from graphFile.Graph_AdjacencyList import GraphAdjacencyList
+
+        components = self.stronglyConnectedComponents()
+        components.reverse()  # Tarjan closes the components in reverse topological order
+        componentOf = {}
+        for c in range(len(components)):
+            for nodeId in components[c]:
+                componentOf[nodeId] = c
+
+        dag = GraphAdjacencyList()
+        for c in range(len(components)):
+            dag.addNode(c)
+        for c in range(len(components)):
+            linked = {c}  # components already linked from c
+            for nodeId in components[c]:
+                for adj_node in self.getAdj(nodeId):
+                    other = componentOf[adj_node]
+                    if other not in linked:
+                        linked.add(other)
+                        dag.insertEdge(c, other)
+        return [dag, components, componentOf]
+
+    def topologicalSort(self):
+        """
+        Compute a topological order of a directed acyclic graph with the
+        Kahn algorithm: the nodes without incoming edges are emitted first,
+        and removing their edges frees the following ones.
+        ---
+        Time Complexity: O(|V|+|E|)
+        :return: the list of node IDs in topological order, or None if the
+        graph has a cycle.
+        """
+        ids, offsets, targets = self._denseAdjacency()
+        inDegree = array('q', bytes(8 * len(ids)))
+        for target in targets:
+            inDegree[target] += 1
+
+        order = array('q', (node for node in range(len(ids)) if inDegree[node] == 0))
+        head = 0
+        while head < len(order):  # the order array is the queue
+            node = order[head]
+            head += 1
+            for k in range(offsets[node], offsets[node + 1]):
+                target = targets[k]
+                inDegree[target] -= 1
+                if inDegree[target] == 0:
+                    order.append(target)
+
+        if len(order) < len(ids):  # the nodes of the cycles are never freed
+            return None
+        return [ids[node] for node in order]
+
+    def connectedComponents(self):
+        """
+        Compute the connected components of the graph (the weakly connected
+        ones, if the graph is directed) with a union-find over flat arrays.
+        ---
+        Time Complexity: O((|V|+|E|) log |V|)
+        :return: the list of components (lists of node IDs); the components
+        and their nodes follow the order of the nodes of the graph.
+        """
+        ids, offsets, targets = self._denseAdjacency()
+        father = array('q', range(len(ids)))
+
+        def find(node):
+            root = node
+            while father[root] != root:
+                root = father[root]
+            while father[node] != root:  # path compression
+                father[node], node = root, father[node]
+            return root
+
+        for node in range(len(ids)):
+            for k in range(offsets[node], offsets[node + 1]):
+                first, second = find(node), find(targets[k])
+                if first != second:
+                    father[max(first, second)] = min(first, second)
+
+        components = []
+        componentOf = {}  # {root: index of the component}
+        for node in range(len(ids)):
+            root = find(node)
+            if root not in componentOf:
+                componentOf[root] = len(components)
+                components.append([])
+            components[componentOf[root]].append(ids[node])
+        return components
+
+    def subgraphView(self, nodeIds):
+        """
+        Return a read-only view of the subgraph induced by some nodes,
+        without copying the graph (see GraphView).
+        :param nodeIds: the IDs of the nodes of the view.
+        :return: the view.
+        """
+        from graphFile.Graph_View import GraphView
+        return GraphView(self, nodeIds)
+
+    def _cachedComponents(self):
+        """
+        Return the connected components, computed again only if the graph
+        has changed since the last call.
+        :return: the list of components (see connectedComponents).
+        """
+        if self.components is None or self.components[0] != self.version:
+            self.components = (self.version, self.connectedComponents())
+        return self.components[1]
+
+    def componentView(self, componentId):
+        """
+        Return a read-only view of a connected component. The components are
+        cached until the graph changes, so a loop over the components
+        computes them once (see also componentViews).
+        :param componentId: the index of the component, in the order of
+        connectedComponents().
+        :return: the view, if the component exists; None, otherwise.
+        """
+        components = self._cachedComponents()
+        if componentId < 0 or componentId >= len(components):
+            return None
+        return self.subgraphView(components[componentId])
+
+    def componentViews(self):
+        """
+        Return a read-only view for each connected component, computing the
+        components once.
+        :return: the list of views, in the order of connectedComponents().
+        """
+        return [self.subgraphView(component) for component in self._cachedComponents()]
+
+    def coreNumbers(self):
+        """
+        Compute the core number of every node of an undirected graph, that
+        is the largest k such that the node belongs to a subgraph where all
+        the nodes have degree at least k, with the Batagelj-Zaversnik
+        algorithm: the nodes are kept sorted by current degree in a single
+        array (vert) split in buckets, where first[d] is the start of the
+        bucket d, and removing the node of minimum degree moves each
+        neighbour with a larger degree one bucket down with a swap.
+        ---
+        Time Complexity: O(|V|+|E|)
+        :return: the dictionary {nodeId: core number}.
+        """
+        ids, offsets, targets = self._denseAdjacency()
+        numNodes = len(ids)
+        degree = array('q', (offsets[v + 1] - offsets[v] for v in range(numNodes)))
+        maxDegree = max(degree, default=0)
+
+        # first[d] = position in vert of the first node with degree d
+        first = array('q', bytes(8 * (maxDegree + 1)))
+        for d in degree:
+            first[d] += 1
+        start = 0
+        for d in range(maxDegree + 1):
+            first[d], start = start, start + first[d]
+
+        vert = array('q', bytes(8 * numNodes))  # the nodes sorted by degree
+        pos = array('q', bytes(8 * numNodes))  # pos[v] = position of v in vert
+        for v in range(numNodes):
+            pos[v] = first[degree[v]]
+            vert[pos[v]] = v
+            first[degree[v]] += 1
+        for d in range(maxDegree, 0, -1):  # restore the first positions
+            first[d] = first[d - 1]
+        first[0] = 0
+
+        for i in range(numNodes):
+            v = vert[i]  # the node of minimum degree left: degree[v] is its core
+            for k in range(offsets[v], offsets[v + 1]):
+                u = targets[k]
+                if degree[u] > degree[v]:
+                    # swap u with the first node of its bucket, then shrink the bucket
+                    du = degree[u]
+                    pu, pw = pos[u], first[du]
+                    w = vert[pw]
+                    if u != w:
+                        vert[pu], vert[pw] = w, u
+                        pos[u], pos[w] = pw, pu
+                    first[du] += 1
+                    degree[u] = du - 1
+
+        return {ids[v]: degree[v] for v in range(numNodes)}
+
+    def randomWalks(self, starts=None, length=10, walksPerNode=1, seed=None, chunk=None,
+                    worker=0, workers=1):
+        """
+        Generate many random walks at once. Each walk starts from a node and
+        moves length times to a uniformly chosen adjacent node; a walk that
+        reaches a node without edges is padded with -1.
+        All the walkers move together: a step draws one random number per
+        walker and computes the next nodes with map over flat arrays
+        (offsets, degrees and targets of the CSR form of the graph), so
+        getAdj and random.choice are never called per step. A virtual dead
+        position -1 (a sentinel after the targets) keeps the padded walks
+        in the same arrays.
+        ---
+        Time Complexity: O(|V|+|E| + walks * length)
+        :param starts: the start node IDs (all the nodes, if missing).
+        :param length: the number of steps of each walk.
+        :param walksPerNode: the number of walks from each start node.
+        :param seed: the seed of the random generator.
+        :param chunk: if specified, the walks are generated in chunks of
+        this many walks, each with its own generator seeded by (seed, chunk
+        index), so any chunk can be generated independently of the others
+        (without a seed, a random base seed is drawn at every call: the
+        workers must share an explicit seed to generate the same walks).
+        :param worker: in chunked mode, the index of this worker.
+        :param workers: in chunked mode, the number of workers; the worker w
+        generates the chunks w, w + workers, w + 2*workers, ...
+        :return: a 2-D memoryview of int64 with a row of length+1 node IDs
+        for each walk (the walks from the same start are consecutive); or, in
+        chunked mode, a generator of pairs (index of the first walk, 2-D
+        memoryview). None, if a start node does not exist or there are no
+        walks.
+        """
+        ids, offsets, targets = self._denseAdjacency()
+        numNodes = len(ids)
+        if starts is None:
+            positions = range(numNodes)
+        else:
+            position = {ids[i]: i for i in range(numNodes)}
+            if any(nodeId not in position for nodeId in starts):
+                return None
+            positions = [position[nodeId] for nodeId in starts]
+        if len(positions) * walksPerNode == 0:
+            return None
+
+        # step tables by position; the extra last entry (index -1) is the dead position
+        deadStart = len(targets)
+        start = array('q', (offsets[i] if offsets[i + 1] > offsets[i] else deadStart
+                            for i in range(numNodes)))
+        start.append(deadStart)
+        degree = array('d', (max(offsets[i + 1] - offsets[i], 1) for i in range(numNodes)))
+        degree.append(1.0)
+        table = array('q', targets)
+        table.append(-1)  # the sentinel: dead nodes step to -1
+        identity = all(ids[i] == i for i in range(numNodes))
+        nodeIds = None if identity else array('q', ids + [-1])
+
+        walkers = array('q', (p for p in positions for _ in range(walksPerNode)))
+
+        def walk(first, count, rng):
+            current = walkers[first:first + count]
+            width = length + 1
+            out = array('q', bytes(8 * count * width))
+            out[0::width] = current
+            for step in range(1, width):
+                draws = array('d', [rng.random() for _ in range(count)])
+                offset = map(int, map(operator.mul, draws, map(degree.__getitem__, current)))
+                current = array('q', map(table.__getitem__,
+                                         map(operator.add, map(start.__getitem__, current), offset)))
+                out[step::width] = current
+            if nodeIds is not None:
+                out = array('q', map(nodeIds.__getitem__, out))
+            return memoryview(out).cast('B').cast('q', [count, width])
+
+        if chunk is None:
+            return walk(0, len(walkers), random.Random(seed))
+        if seed is None:
+            seed = random.randrange(2 ** 63)  # a fresh base seed for the chunks of this call
+
+        def chunks():
+            for index in range(worker, (len(walkers) + chunk - 1) // chunk, workers):
+                first = index * chunk
+                rng = random.Random("{}:{}".format(seed, index))
+                yield first, walk(first, min(chunk, len(walkers) - first), rng)
+        return chunks()
+
     def genericSearch(self, rootId):
         """
         Execute a generic search in the graph starting from the specified node.
@@ -506,7 +1517,7 @@ class GraphBase(Graph, metaclass=ABCMeta):
         if rootId not in self.nodes:
             return None
 
-        treeNode = TreeN.ode(rootId)
+        treeNode = TreeNode(rootId)
         tree = Tree(treeNode)
         vertexSet = {treeNode}  # nodes to explore
         markedNodes = {rootId}  # nodes already explored
@@ -521,6 +1532,8 @@ class GraphBase(Graph, metaclass=ABCMeta):
                     treeNode.sons.append(newTreeNode)
                     vertexSet.add(newTreeNode)
                     markedNodes.add(nodeIndex)  # mark as explored
+        if self.stats is not None:
+            self.stats.treeNodes += len(markedNodes)  # one tree node per marked node
         return tree
 
     def bfs(self, rootId):
@@ -594,5 +1607,43 @@ class GraphBase(Graph, metaclass=ABCMeta):
         ...
 
 
+def _asArray(buffer, typecode):
+    """
+    Return an unpickled buffer as an array of the specified type, without
+    copying it if it is not already an array.
+    :param buffer: the array or the buffer (bytes, bytearray, PickleBuffer).
+    :param typecode: the array type ('q' or 'd').
+    :return: the array, or a memoryview of the buffer with that format.
+    """
+    if isinstance(buffer, array):
+        return buffer
+    view = memoryview(buffer)
+    return view if view.format == typecode else view.cast('B').cast(typecode)
+
+
+def _unpickleGraph(cls, undirected, nextId, indexed, ids, offsets, targets, weights, state=None):
+    """
+    Rebuild a graph pickled by GraphBase.__reduce_ex__.
+    :param cls: the class of the graph.
+    :param undirected: if True, the graph is undirected.
+    :param nextId: the next node ID to be assigned.
+    :param indexed: if True, the degree index is rebuilt.
+    :param ids, offsets, targets, weights: the exported arrays.
+    :param state: the state returned by _pickleState (the exact weights,
+    if present, replace the exported ones).
+    :return: the graph.
+    """
+    state = {} if state is None else dict(state)
+    exactWeights = state.pop("weights", None)
+    weights = _asArray(weights, 'd') if exactWeights is None else exactWeights
+    graph = cls.fromArrays(_asArray(ids, 'q'), _asArray(offsets, 'q'), _asArray(targets, 'q'),
+                           weights, undirected)
+    graph._restoreState(state)
+    graph.nextId = nextId
+    if indexed:
+        graph.enableDegreeIndex()
+    return graph
+
+
 if __name__ == "__main__":
     graph = GraphBase()  # error due to the instantiation of an abstract class
@@ -1,3 +1,5 @@
+from array import array
+
 from graphFile.Graph import GraphBase
 from graphFile.base import Edge, Node
 from tree.treeArrayList import TreeArrayListNode as TreeNode
@@ -14,15 +16,18 @@ class GraphAdjacencyList(GraphBase):
     A graph, implemented as an adjacency list.
     Each node u has a list containing its adjacent nodes, that is nodes v such
     that exists an edges (u,v).
+    In undirected mode, the edge {u,v} is listed in the lists of both u and v
+    but it is counted once.
     ---
     Memory Complexity: O(|V|+|E|)
     """
 
-    def __init__(self):
+    def __init__(self, undirected=False):
         """
         Constructor.
+        :param undirected: if True, the graph is undirected.
         """
-        super().__init__()
+        super().__init__(undirected)
         self.adj = {} # adjacency lists {nodeID:listOfAdjacentNodes}
 
     def numEdges(self):
@@ -30,7 +35,18 @@ class GraphAdjacencyList(GraphBase):
         Return the number of edges.
         :return: the number of edges.
         """
-        return sum(len(adj_list) for adj_list in self.adj.values())
+        if not self.undirected:
+            return sum(len(adj_list) for adj_list in self.adj.values())
+
+        # each edge {u,v} is counted only from its smallest endpoint
+        num_edges = 0
+        for adj_item in self.adj.items():
+            curr = adj_item[1].getFirstRecord()
+            while curr is not None:
+                if curr.elem >= adj_item[0]:
+                    num_edges += 1
+                curr = curr.next
+        return num_edges
 
     def addNode(self, elem):
         """
@@ -42,6 +58,7 @@ class GraphAdjacencyList(GraphBase):
 
         self.nodes[newnode.id] = newnode # add the new node to the dictionary
         self.adj[newnode.id] = List() # create the adjacency list for the new node
+        self._nodeAdded(newnode.id)
 
         return newnode
 
@@ -65,18 +82,27 @@ class GraphAdjacencyList(GraphBase):
         # remove the node from the set of nodes, that is to remove the node
         # from the dictionary nodes
         del self.nodes[nodeId]
+        self._nodeRemoved(nodeId)
 
         # remove all edges starting from the node, that is to remove the
         # adjacency list for the node
+        neighbours = self.getAdj(nodeId)
         del self.adj[nodeId]
 
         # remove all edges pointing to the node, that is to remove the node
-        # from all the adjacency lists
-        for adj in self.adj.values():
+        # from all the adjacency lists (only the neighbours' lists, if the
+        # graph is undirected)
+        adjNodes = self.adj.keys()
+        if self.undirected:
+            adjNodes = [adj_node for adj_node in set(neighbours)
+                        if adj_node in self.adj]
+        for adj_node in adjNodes:
+            adj = self.adj[adj_node]
             curr = adj.getFirstRecord()
             while curr is not None:
                 if curr.elem == nodeId:
                     adj.deleteRecord(curr)
+                    self._degreeChanged(adj_node, -1)
                 curr = curr.next
 
     def getNode(self, id):
@@ -140,6 +166,10 @@ class GraphAdjacencyList(GraphBase):
         # if tail and head exist, add the entry into the adjacency list
         if tail in self.nodes and head in self.nodes: #TODO overwrite if edge already exists
             self.adj[tail].addAsLast(head)
+            self._degreeChanged(tail, 1)
+            if self.undirected and tail != head:
+                self.adj[head].addAsLast(tail)
+                self._degreeChanged(head, 1)
 
     def deleteEdge(self, tail, head):
         """
@@ -150,12 +180,24 @@ class GraphAdjacencyList(GraphBase):
         """
         # if tail and head exist, delete the edge
         if tail in self.nodes and head in self.nodes:
-            curr = self.adj[tail].getFirstRecord()
-            while curr is not None:
-                if curr.elem == head:
-                    self.adj[tail].deleteRecord(curr)
-                    break
-                curr = curr.next
+            self._deleteEntry(tail, head)
+            if self.undirected and tail != head:
+                self._deleteEntry(head, tail)
+
+    def _deleteEntry(self, tail, head):
+        """
+        Remove the first entry head from the adjacency list of tail.
+        :param tail: the tail node ID (integer).
+        :param head: the head node ID (integer).
+        :return: void.
+        """
+        curr = self.adj[tail].getFirstRecord()
+        while curr is not None:
+            if curr.elem == head:
+                self.adj[tail].deleteRecord(curr)
+                self._degreeChanged(tail, -1)
+                break
+            curr = curr.next
 
     def getEdge(self, tail, head):
         """
@@ -181,7 +223,9 @@ class GraphAdjacencyList(GraphBase):
         for adj_item in self.adj.items():
             curr = adj_item[1].getFirstRecord()
             while curr is not None:
-                edges.append(Edge(adj_item[0], curr.elem, None))
+                # undirected edges are reported once, from the smallest endpoint
+                if not self.undirected or curr.elem >= adj_item[0]:
+                    edges.append(Edge(adj_item[0], curr.elem, None))
                 curr = curr.next
         return edges
 
@@ -243,6 +287,17 @@ class GraphAdjacencyList(GraphBase):
         else:
             return len(self.adj[nodeId])
 
+    def exportArrays(self):
+        """
+        Export the graph as flat arrays (see GraphBase.exportArrays); the
+        adjacency lists do not store weights, so all the weights are NaN.
+        ---
+        Time Complexity: O(|V|+|E|)
+        :return: the list [ids, offsets, targets, weights].
+        """
+        ids, offsets, targets = self._denseAdjacency()
+        return [array('q', ids), offsets, targets, array('d', [float('nan')]) * len(targets)]
+
     def print(self):
         """
         Print the graph.
@@ -0,0 +1,659 @@
+from array import array
+from itertools import repeat
+import operator
+
+from graphFile.Graph import GraphBase
+from graphFile.base import Edge, Node
+
+
+class GraphCSR(GraphBase):
+    """
+    A frozen (read-only) graph, implemented in Compressed Sparse Row format.
+    The nodes are stored in positions 0..n-1: the adjacent positions of the
+    node in position i are targets[offsets[i]:offsets[i+1]], with the weights
+    in the same range of weights (NaN if missing), and ids[i] is its node ID.
+    If the node IDs are exactly 0..n-1, ids is not stored and the positions
+    are the IDs themselves. The node values that differ from the IDs are
+    kept in the dictionary values (they are not published in shared
+    memory).
+    In undirected mode, each edge is listed from both its endpoints.
+    The arrays can be published in shared memory and attached, without
+    copies, by other processes.
+    ---
+    Memory Complexity: O(|V|+|E|), 8 bytes per node and 16 bytes per edge
+    """
+
+    # header of the shared memory layout: magic, number of nodes, number of
+    # targets, number of edges, undirected, identity IDs (int64 each)
+    MAGIC = 0x43535247  # "GRSC"
+    HEADER = 6
+
+    def __init__(self, ids, offsets, targets, weights, undirected=False, numEdges=None):
+        """
+        Constructor.
+        :param ids: the node IDs by position (integers), or None if the IDs
+        are the positions 0..n-1.
+        :param offsets: the n+1 offsets of the adjacency ranges.
+        :param targets: the adjacent positions.
+        :param weights: the weights of the edges (NaN if missing).
+        :param undirected: if True, the graph is undirected.
+        :param numEdges: the number of edges (computed, if missing).
+        """
+        super().__init__(undirected)
+        numNodes = len(offsets) - 1
+        if ids is not None and all(ids[i] == i for i in range(numNodes)):
+            ids = None
+        self.ids = ids
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.shm = None  # the shared memory block, if published or attached
+        self.originalIds = None  # original node IDs by node ID, if the graph has been reordered
+        self.values = {}  # {nodeId: value} of the nodes whose value is not their ID
+
+        # {nodeId: position}; a range if the IDs are the positions
+        self.nodes = range(numNodes) if ids is None else {ids[i]: i for i in range(numNodes)}
+        self.nextId = numNodes
+
+        if numEdges is None:
+            numEdges = len(targets)
+            if undirected:
+                # each edge is listed twice, apart from self-loops
+                loops = sum(1 for i in range(numNodes)
+                            for k in range(offsets[i], offsets[i + 1]) if targets[k] == i)
+                numEdges = (len(targets) + loops) // 2
+        self.edgeCount = numEdges
+
+    @classmethod
+    def fromGraph(cls, graph):
+        """
+        Build the frozen copy of a graph.
+        :param graph: the graph (any backend).
+        :return: the frozen graph.
+        """
+        ids, offsets, targets, weights = graph.exportArrays()
+        frozen = cls(ids, offsets, targets, weights, graph.undirected, graph.numEdges())
+        frozen.values = graph._nodeValues()
+        return frozen
+
+    @classmethod
+    def fromArrays(cls, ids, offsets, targets, weights=None, undirected=False):
+        """
+        Build a frozen graph from the arrays exported by exportArrays(); the
+        arrays are used as they are, without copies.
+        :param ids: the node IDs by position (None, if they are 0..n-1).
+        :param offsets: the n+1 offsets of the adjacency ranges.
+        :param targets: the adjacent positions.
+        :param weights: the weights of the entries (NaN if missing), or None.
+        :param undirected: if True, the graph is undirected.
+        :return: the frozen graph.
+        """
+        if weights is None:
+            weights = array('d', [float('nan')]) * len(targets)
+        return cls(ids, offsets, targets, weights, undirected)
+
+    def exportArrays(self):
+        """
+        Export the graph as flat arrays (see GraphBase.exportArrays): the
+        arrays of the graph are returned as they are, without copies, so
+        they must not be modified.
+        ---
+        Time Complexity: O(1); O(|V|) if the IDs are 0..n-1
+        :return: the list [ids, offsets, targets, weights].
+        """
+        ids = self.ids
+        if ids is None:
+            ids = array('q', range(len(self.offsets) - 1))
+        return [ids, self.offsets, self.targets, self.weights]
+
+    def reorder(self, strategy="bfs"):
+        """
+        Return a copy of the graph with the nodes renumbered 0..n-1 in an
+        order that improves the locality of the traversals: adjacent nodes
+        get close IDs, so the adjacency ranges read by a visit are close in
+        memory. The original IDs are kept in originalIds (see originalId and
+        toOriginal, to translate the results back).
+        The strategies are:
+        - "bfs": breadth-first order, one component after the other;
+        - "rcm": Reverse Cuthill-McKee, a BFS from a node of minimum degree
+          that visits the neighbours by increasing degree, then reversed;
+        - "degree": decreasing degree (hubs first).
+        ---
+        Time Complexity: O(|V|+|E| log d), where d is the maximum degree (the
+        rows of the copy are sorted, and "rcm" also sorts the neighbours)
+        :param strategy: the reordering strategy.
+        :return: the reordered graph.
+        """
+        numNodes = len(self.offsets) - 1
+        offsets, targets = self.offsets, self.targets
+        degree = [offsets[i + 1] - offsets[i] for i in range(numNodes)]
+
+        if strategy == "degree":
+            order = self._byDegree(degree, reverse=True)
+        elif strategy in ("bfs", "rcm"):
+            rcm = strategy == "rcm"
+            # the visits start from the nodes of minimum degree for RCM
+            seeds = self._byDegree(degree) if rcm else range(numNodes)
+            visited = bytearray(numNodes)
+            order = array('q')
+            for seed in seeds:
+                if visited[seed]:
+                    continue
+                visited[seed] = 1
+                head = len(order)
+                order.append(seed)
+                while head < len(order):  # the order array is the BFS queue
+                    position = order[head]
+                    head += 1
+                    adjacent = targets[offsets[position]:offsets[position + 1]]
+                    if rcm:
+                        adjacent = sorted(adjacent, key=degree.__getitem__)
+                    for target in adjacent:
+                        if not visited[target]:
+                            visited[target] = 1
+                            order.append(target)
+            if rcm:
+                order.reverse()
+        else:
+            raise Exception("Error: unknown reordering strategy {}!".format(strategy))
+
+        # newPosition[old position] = new position
+        newPosition = array('q', bytes(8 * numNodes))
+        for position in range(numNodes):
+            newPosition[order[position]] = position
+
+        newOffsets = array('q', [0])
+        newTargets = array('q')
+        newWeights = array('d')
+        for oldPosition in order:
+            start, end = offsets[oldPosition], offsets[oldPosition + 1]
+            row = sorted(zip((newPosition[target] for target in targets[start:end]),
+                             self.weights[start:end]))
+            newTargets.extend(target for target, _ in row)
+            newWeights.extend(weight for _, weight in row)
+            newOffsets.append(len(newTargets))
+
+        graph = GraphCSR(None, newOffsets, newTargets, newWeights, self.undirected, self.edgeCount)
+        graph.originalIds = array('q', (self.originalId(self._id(position)) for position in order))
+        graph.values = {newPosition[self._position(nodeId)]: value for nodeId, value in self.values.items()}
+        return graph
+
+    @staticmethod
+    def _byDegree(degree, reverse=False):
+        """
+        Sort the positions by degree (counting sort, stable).
+        :param degree: the degrees by position.
+        :param reverse: if True, the order is by decreasing degree.
+        :return: the array of positions.
+        """
+        buckets = [array('q') for _ in range(max(degree, default=0) + 1)]
+        for position in range(len(degree)):
+            buckets[degree[position]].append(position)
+        if reverse:
+            buckets.reverse()
+        order = array('q')
+        for bucket in buckets:
+            order.extend(bucket)
+        return order
+
+    def originalId(self, nodeId):
+        """
+        Return the ID a node had before the graph was reordered.
+        :param nodeId: the node ID.
+        :return: the original node ID.
+        """
+        return nodeId if self.originalIds is None else self.originalIds[nodeId]
+
+    def toOriginal(self, result, keys=True, values=True):
+        """
+        Translate a result computed on the reordered graph to the original
+        node IDs. Only the integers in the positions selected by keys and
+        values are taken as node IDs: the other ones (counters, distances,
+        ...) must be excluded, e.g. toOriginal(eccentricities, values=False).
+        :param result: a node ID, or nested lists, tuples and dictionaries.
+        :param keys: if True, the keys of the dictionaries are node IDs.
+        :param values: if True, the items of the lists and tuples and the
+        values of the dictionaries are node IDs (or results to translate).
+        :return: the same result, with the original node IDs.
+        """
+        if self.originalIds is None:
+            return result
+        if isinstance(result, dict):
+            return {(self.toOriginal(key) if keys else key):
+                    (self.toOriginal(value, keys, values) if values else value)
+                    for key, value in result.items()}
+        if not values:
+            return result
+        if isinstance(result, (list, tuple)):
+            return type(result)(self.toOriginal(item, keys, values) for item in result)
+        if isinstance(result, int) and not isinstance(result, bool):
+            return self.originalIds[result]
+        return result
+
+    def _nodeValues(self):
+        """
+        Return the values of the nodes that are not their IDs.
+        :return: the dictionary {nodeId: value}.
+        """
+        return dict(self.values)
+
+    def _pickleState(self):
+        """
+        Return the state that the exported arrays do not keep (see
+        GraphBase._pickleState), with the original IDs of a reordered graph.
+        :return: the dictionary of the state.
+        """
+        state = super()._pickleState()
+        if self.originalIds is not None:
+            state["originalIds"] = array('q', self.originalIds)
+        return state
+
+    def _restoreState(self, state):
+        """
+        Restore the state returned by _pickleState().
+        :param state: the dictionary of the state.
+        :return: void.
+        """
+        self.values = dict(state.get("values", {}))
+        self.originalIds = state.get("originalIds", self.originalIds)
+
+    def _position(self, nodeId):
+        """
+        Return the position of a node.
+        :param nodeId: the node ID.
+        :return: the node position.
+        """
+        if nodeId not in self.nodes:  # a range would accept the negative IDs as indexes
+            raise KeyError(nodeId)
+        return self.nodes[nodeId]
+
+    def _id(self, position):
+        """
+        Return the node ID stored in the specified position.
+        :param position: the node position.
+        :return: the node ID.
+        """
+        return position if self.ids is None else self.ids[position]
+
+    def spmv(self, x, transpose=False, weighted=True):
+        """
+        Multiply the adjacency matrix A of the graph by a vector, where
+        A[i][j] is the weight of the edge from position i to position j
+        (1.0, if the edge has no weight or weighted is False).
+        The product A x is a gather: the values x[targets[k]] of all the
+        edges are collected at once (the loop runs inside map) and each row
+        sums its own slice, so the rounding error of a row does not depend
+        on the other rows. The transposed product A^T x is a scatter
+        (y[j] += A[i][j]*x[i]) along the rows.
+        ---
+        Time Complexity: O(|V|+|E|)
+        :param x: the vector, indexed by position (any sequence of floats).
+        :param transpose: if True, compute A^T x instead of A x.
+        :param weighted: if False, the weights are ignored.
+        :return: the result vector, as array('d') indexed by position.
+        """
+        numNodes = len(self.offsets) - 1
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        if weighted:
+            # the missing weights (NaN) count as 1.0
+            weighted = any(weight == weight for weight in weights)
+            if weighted:
+                weights = array('d', (1.0 if weight != weight else weight for weight in weights))
+
+        if not transpose:
+            gathered = map(x.__getitem__, targets)
+            if weighted:
+                gathered = map(operator.mul, gathered, weights)
+            gathered = array('d', gathered)
+            return array('d', (sum(gathered[offsets[i]:offsets[i + 1]]) for i in range(numNodes)))
+
+        y = array('d', bytes(8 * numNodes))
+        for i in range(numNodes):
+            xi = x[i]
+            if xi == 0.0:
+                continue
+            start, end = offsets[i], offsets[i + 1]
+            if weighted:
+                for k in range(start, end):
+                    y[targets[k]] += xi * weights[k]
+            else:
+                for target in targets[start:end]:
+                    y[target] += xi
+        return y
+
+    def transpose(self):
+        """
+        Return the graph with all the edges reversed (the graph itself, if
+        undirected), built with a counting sort of the edges by head.
+        ---
+        Time Complexity: O(|V|+|E|)
+        :return: the transposed graph.
+        """
+        if self.undirected:
+            return self
+        numNodes = len(self.offsets) - 1
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+
+        newOffsets = array('q', bytes(8 * (numNodes + 1)))
+        for target in targets:
+            newOffsets[target + 1] += 1
+        for i in range(numNodes):
+            newOffsets[i + 1] += newOffsets[i]
+
+        cursor = array('q', newOffsets[:numNodes])
+        newTargets = array('q', bytes(8 * len(targets)))
+        newWeights = array('d', bytes(8 * len(targets)))
+        for i in range(numNodes):
+            for k in range(offsets[i], offsets[i + 1]):
+                target = targets[k]
+                newTargets[cursor[target]] = i
+                newWeights[cursor[target]] = weights[k]
+                cursor[target] += 1
+
+        graph = GraphCSR(self.ids, newOffsets, newTargets, newWeights, False, self.edgeCount)
+        graph.values = self.values
+        graph.originalIds = self.originalIds
+        return graph
+
+    def pagerank(self, damping=0.85, tol=1e-6, maxIter=100):
+        """
+        Compute the PageRank of the nodes by power iteration: at each step
+        every node spreads its rank evenly along its edges, computed as one
+        gather spmv on the transposed graph (built once); the rank of the
+        dangling nodes (without edges) is spread over all the nodes.
+        ---
+        Time Complexity: O(maxIter * (|V|+|E|))
+        :param damping: the probability of following an edge.
+        :param tol: the convergence threshold on the L1 norm of the change.
+        :param maxIter: the maximum number of iterations.
+        :return: the dictionary {nodeId: rank}; the ranks sum to 1.
+        """
+        numNodes = len(self.offsets) - 1
+        if numNodes == 0:
+            return {}
+        offsets = self.offsets
+        # the dangling nodes get an infinite out-degree: they spread nothing along edges
+        outDegree = array('d', (offsets[i + 1] - offsets[i] or float('inf') for i in range(numNodes)))
+        dangling = array('q', (i for i in range(numNodes) if offsets[i + 1] == offsets[i]))
+
+        incoming = self.transpose()
+        rank = array('d', [1.0 / numNodes]) * numNodes
+        for iteration in range(maxIter):
+            share = array('d', map(operator.truediv, rank, outDegree))
+            spread = incoming.spmv(share, weighted=False)
+            base = (1.0 - damping + damping * sum(map(rank.__getitem__, dangling))) / numNodes
+            newRank = array('d', map(operator.add, map(operator.mul, spread, repeat(damping)), repeat(base)))
+            change = sum(map(abs, map(operator.sub, newRank, rank)))
+            rank = newRank
+            if change < tol:
+                break
+
+        return {self._id(i): rank[i] for i in range(numNodes)}
+
+    def _denseAdjacency(self):
+        """
+        Return the adjacency of the graph in CSR form (see GraphBase): the
+        arrays of the graph are returned as they are, without copies.
+        :return: the list of node IDs by position, the offsets array and the
+        targets array.
+        """
+        return [self._id(position) for position in range(len(self.offsets) - 1)], self.offsets, self.targets
+
+    def _readOnly(self):
+        """
+        Refuse a mutation of the frozen graph.
+        :return: void.
+        """
+        raise Exception("Error: the graph is frozen (read-only)!")
+
+    def numEdges(self):
+        """
+        Return the number of edges.
+        :return: the number of edges.
+        """
+        return self.edgeCount
+
+    def addNode(self, elem):
+        """
+        Not supported: the graph is read-only.
+        """
+        self._readOnly()
+
+    def deleteNode(self, nodeId):
+        """
+        Not supported: the graph is read-only.
+        """
+        self._readOnly()
+
+    def insertEdge(self, tail, head, weight=None):
+        """
+        Not supported: the graph is read-only.
+        """
+        self._readOnly()
+
+    def deleteEdge(self, tail, head):
+        """
+        Not supported: the graph is read-only.
+        """
+        self._readOnly()
+
+    def getNode(self, id):
+        """
+        Return the node, if exists.
+        :param id: the node ID (integer).
+        :return: the node, if exists; None, otherwise.
+        """
+        return Node(id, self.values.get(id, id)) if id in self.nodes else None
+
+    def getNodes(self):
+        """
+        Return the list of nodes.
+        :return: the list of nodes.
+        """
+        values = self.values
+        return [Node(nodeId, values.get(nodeId, nodeId)) for nodeId in self.nodes]
+
+    def getEdge(self, tail, head):
+        """
+        Return the node, if exists.
+        :param tail: the tail node ID (integer).
+        :param head: the head node ID (integer).
+        :return: the edge, if exists; None, otherwise.
+        """
+        if tail not in self.nodes or head not in self.nodes:
+            return None
+        position, target = self._position(tail), self._position(head)
+        for k in range(self.offsets[position], self.offsets[position + 1]):
+            if self.targets[k] == target:
+                weight = self.weights[k]
+                return Edge(tail, head, None if weight != weight else weight)
+        return None
+
+    def getEdges(self):
+        """
+        Return the list of edges.
+        :return: the list of edges.
+        """
+        edges = []
+        for position in range(len(self.offsets) - 1):
+            for k in range(self.offsets[position], self.offsets[position + 1]):
+                target = self.targets[k]
+                # undirected edges are reported once, from the smallest position
+                if not self.undirected or target >= position:
+                    weight = self.weights[k]
+                    edges.append(Edge(self._id(position), self._id(target),
+                                      None if weight != weight else weight))
+        return edges
+
+    def isAdj(self, tail, head):
+        """
+        Checks if two nodes ar adjacent.
+        :param tail: the tail node ID (integer).
+        :param head: the head node ID (integer).
+        :return: True, if the two nodes are adjacent; False, otherwise.
+        """
+        return self.getEdge(tail, head) is not None
+
+    def getAdj(self, nodeId):
+        """
+        Return all nodes adjacent to the one specified.
+        :param nodeId: the node id.
+        :return: the list of nodes adjacent to the one specified.
+        """
+        position = self._position(nodeId)
+        adjacent = self.targets[self.offsets[position]:self.offsets[position + 1]]
+        if self.ids is None:
+            return adjacent.tolist()
+        ids = self.ids
+        return [ids[target] for target in adjacent]
+
+    def deg(self, nodeId):
+        """
+        Return the node degree.
+        :param nodeId: the node id.
+        :return: the node degree.
+        """
+        if nodeId not in self.nodes:
+            return 0
+        position = self._position(nodeId)
+        return self.offsets[position + 1] - self.offsets[position]
+
+    def publish(self):
+        """
+        Copy the arrays of the graph into a new shared memory block, which
+        other processes can attach with GraphCSR.attach(name).
+        The block lives until unlink() is called.
+        :return: the name of the shared memory block.
+        """
+        from multiprocessing import shared_memory
+
+        numNodes = len(self.offsets) - 1
+        parts = [array('q', [GraphCSR.MAGIC, numNodes, len(self.targets), self.edgeCount,
+                             int(self.undirected), int(self.ids is None)])]
+        if self.ids is not None:
+            parts.append(array('q', self.ids))
+        parts += [array('q', self.offsets), array('q', self.targets), array('d', self.weights)]
+
+        size = sum(len(part) * part.itemsize for part in parts)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        start = 0
+        for part in parts:
+            data = part.tobytes()
+            self.shm.buf[start:start + len(data)] = data
+            start += len(data)
+        return self.shm.name
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Build a read-only view of a graph published in shared memory: the
+        arrays are not copied, only the {nodeId: position} dictionary is
+        rebuilt (if the IDs are not 0..n-1).
+        :param name: the name of the shared memory block.
+        :return: the frozen graph.
+        """
+        from multiprocessing import shared_memory
+
+        try:
+            # the block is owned by the publisher: do not track (unlink) it here
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:  # Python < 3.13
+            shm = shared_memory.SharedMemory(name=name)
+
+        buffer = shm.buf
+        header = buffer[:8 * GraphCSR.HEADER].cast('q')
+        magic, numNodes, numTargets, numEdges, undirected, identity = header.tolist()
+        header.release()
+        if magic != GraphCSR.MAGIC:
+            shm.close()
+            raise Exception("Error: {} does not contain a published graph!".format(name))
+
+        def take(start, count, typecode):
+            return buffer[start:start + 8 * count].cast(typecode), start + 8 * count
+
+        start = 8 * GraphCSR.HEADER
+        ids = None
+        if not identity:
+            ids, start = take(start, numNodes, 'q')
+        offsets, start = take(start, numNodes + 1, 'q')
+        targets, start = take(start, numTargets, 'q')
+        weights, start = take(start, numTargets, 'd')
+
+        graph = cls(ids, offsets, targets, weights, bool(undirected), numEdges)
+        graph.shm = shm
+        return graph
+
+    def detach(self):
+        """
+        Release the shared memory block used by this process.
+        :return: void.
+        """
+        if self.shm is None:
+            return
+        for view in (self.ids, self.offsets, self.targets, self.weights):
+            if isinstance(view, memoryview):
+                view.release()
+        self.shm.close()
+        self.shm = None
+
+    def unlink(self):
+        """
+        Destroy the published shared memory block (to be called by the
+        publisher, when no worker needs it anymore).
+        :return: void.
+        """
+        if self.shm is None:
+            return
+        shm = self.shm
+        self.detach()
+        shm.unlink()
+
+    def print(self):
+        """
+        Print the graph.
+        :return: void.
+        """
+        if self.isEmpty():
+            print("CSR: EMPTY")
+            return
+
+        print("CSR:")
+        for nodeId in self.nodes:
+            print("{}:{}".format(nodeId, self.getAdj(nodeId)))
+
+
+def _worker(name, rootId, connection):
+    """
+    Example worker: attach a published graph and run a BFS on it.
+    """
+    graph = GraphCSR.attach(name)
+    connection.send(graph.bfs(rootId))
+    graph.detach()
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    from graphFile.Graph_AdjacencyList import GraphAdjacencyList
+
+    source = GraphAdjacencyList(undirected=True)
+    for i in range(10):
+        source.addNode(i)
+    for i in range(9):
+        source.insertEdge(i, i + 1)
+
+    graph = GraphCSR.fromGraph(source)
+    graph.print()
+    name = graph.publish()
+    print("Published as:", name)
+
+    workers = []
+    for rootId in (0, 5):
+        parent, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_worker, args=(name, rootId, child))
+        process.start()
+        workers.append((rootId, process, parent))
+    for rootId, process, parent in workers:
+        print("BFS with root {} in a worker: {}".format(rootId, parent.recv()))
+        process.join()
+
+    graph.unlink()
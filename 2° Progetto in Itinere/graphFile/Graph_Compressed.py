@@ -0,0 +1,427 @@
+from array import array
+from itertools import accumulate
+
+from graphFile.Graph import GraphBase
+from graphFile.base import Edge, Node
+
+
+class GraphCompressed(GraphBase):
+    """
+    A read-only graph, with the adjacency compressed in a single buffer of
+    bytes (as in WebGraph): the nodes are stored in positions 0..n-1, the
+    adjacent positions of each node are sorted and written as gaps, each
+    one encoded as a variable-length integer (LEB128: 7 bits per byte, the
+    high bit set on all the bytes but the last). The first adjacent
+    position is written as its (zig-zag encoded) distance from the node
+    itself. The adjacency of the node in position i is in
+    data[offsets[i]:offsets[i+1]] and ids[i] is its node ID (ids is not
+    stored if the IDs are 0..n-1).
+    getAdj, deg and isAdj decode the adjacency on the fly; the edge weights
+    are not stored. The graph can be saved to a file and loaded back with
+    mmap, without reading the buffer into memory.
+    ---
+    Memory Complexity: O(|V|+|E|), 8 bytes per node and 1-2 bytes per edge
+    on graphs with close node IDs
+    """
+
+    # header of the file layout: magic, number of nodes, size of the data,
+    # number of edges, undirected, identity IDs (int64 each)
+    MAGIC = 0x43564752  # "RGVC"
+    HEADER = 6
+    # 0 for the last byte of a varint, 1 for the other bytes
+    _CONTINUES = bytes(int(byte >= 0x80) for byte in range(256))
+
+    def __init__(self, ids, offsets, data, undirected=False, numEdges=None):
+        """
+        Constructor.
+        :param ids: the node IDs by position (integers), or None if the IDs
+        are the positions 0..n-1.
+        :param offsets: the n+1 offsets of the adjacency ranges in data.
+        :param data: the encoded adjacency (bytes or memoryview).
+        :param undirected: if True, the graph is undirected.
+        :param numEdges: the number of edges (computed, if missing).
+        """
+        super().__init__(undirected)
+        numNodes = len(offsets) - 1
+        if ids is not None and all(ids[i] == i for i in range(numNodes)):
+            ids = None
+        self.ids = ids
+        self.offsets = offsets
+        self.data = data
+        self.file = None  # the mapped file, if loaded with mmap
+
+        # {nodeId: position}; a range if the IDs are the positions
+        self.nodes = range(numNodes) if ids is None else {ids[i]: i for i in range(numNodes)}
+        self.nextId = numNodes
+
+        if numEdges is None:
+            numEdges = sum(self._deg(position) for position in range(numNodes))
+            if undirected:
+                # each edge is listed twice, apart from self-loops
+                loops = sum(self._adjacent(position).count(position) for position in range(numNodes))
+                numEdges = (numEdges + loops) // 2
+        self.edgeCount = numEdges
+
+    @staticmethod
+    def _encode(values, data):
+        """
+        Append unsigned integers to a buffer, as LEB128 varints.
+        :param values: the integers (>= 0).
+        :param data: the bytearray.
+        :return: void.
+        """
+        for value in values:
+            while value >= 0x80:
+                data.append(0x80 | (value & 0x7f))
+                value >>= 7
+            data.append(value)
+
+    @staticmethod
+    def _decode(chunk):
+        """
+        Decode a sequence of LEB128 varints.
+        :param chunk: the encoded bytes.
+        :return: the list of integers.
+        """
+        if len(chunk) == 0:
+            return []
+        if max(chunk) < 0x80:  # one byte per value: no Python loop
+            return list(chunk)
+        values = []
+        value = shift = 0
+        for byte in chunk:
+            value |= (byte & 0x7f) << shift
+            if byte & 0x80:
+                shift += 7
+            else:
+                values.append(value)
+                value = shift = 0
+        return values
+
+    @classmethod
+    def fromArrays(cls, ids, offsets, targets, weights=None, undirected=False, numEdges=None):
+        """
+        Build a compressed graph from the arrays exported by exportArrays();
+        the weights are ignored.
+        ---
+        Time Complexity: O(|V|+|E|log(|E|/|V|))
+        :param ids: the node IDs by position.
+        :param offsets: the n+1 offsets of the adjacency ranges.
+        :param targets: the adjacent positions.
+        :param weights: ignored (the weights are not stored).
+        :param undirected: if True, the graph is undirected.
+        :param numEdges: the number of edges (computed, if missing).
+        :return: the compressed graph.
+        """
+        data = bytearray()
+        dataOffsets = array('q', [0])
+        for position in range(len(offsets) - 1):
+            adjacent = sorted(targets[offsets[position]:offsets[position + 1]])
+            if len(adjacent) > 0:
+                first = adjacent[0] - position
+                gaps = [2 * first if first >= 0 else -2 * first - 1]  # zig-zag
+                gaps.extend(adjacent[k] - adjacent[k - 1] for k in range(1, len(adjacent)))
+                cls._encode(gaps, data)
+            dataOffsets.append(len(data))
+        return cls(ids, dataOffsets, bytes(data), undirected, numEdges)
+
+    @classmethod
+    def fromGraph(cls, graph):
+        """
+        Build the compressed copy of a graph.
+        :param graph: the graph (any backend).
+        :return: the compressed graph.
+        """
+        ids, offsets, targets, weights = graph.exportArrays()
+        return cls.fromArrays(ids, offsets, targets, None, graph.undirected, graph.numEdges())
+
+    def _chunk(self, position):
+        """
+        Return the encoded adjacency of a position.
+        :param position: the node position.
+        :return: the encoded bytes.
+        """
+        return bytes(self.data[self.offsets[position]:self.offsets[position + 1]])
+
+    def _adjacent(self, position):
+        """
+        Decode the adjacent positions of a position.
+        :param position: the node position.
+        :return: the sorted list of adjacent positions.
+        """
+        gaps = self._decode(self._chunk(position))
+        if len(gaps) > 0:
+            first = gaps[0]
+            gaps[0] = position + (first >> 1 if first & 1 == 0 else -((first + 1) >> 1))
+        return list(accumulate(gaps))
+
+    def _deg(self, position):
+        """
+        Return the number of adjacent positions, counting the varints
+        without decoding them.
+        :param position: the node position.
+        :return: the degree.
+        """
+        return self._chunk(position).translate(GraphCompressed._CONTINUES).count(0)
+
+    def _id(self, position):
+        """
+        Return the node ID of a position.
+        :param position: the position.
+        :return: the node ID.
+        """
+        return position if self.ids is None else self.ids[position]
+
+    def dataSize(self):
+        """
+        Return the size of the compressed adjacency.
+        :return: the number of bytes of the data buffer.
+        """
+        return self.offsets[len(self.offsets) - 1]
+
+    def _denseAdjacency(self):
+        """
+        Return the adjacency of the graph in CSR form (see
+        GraphBase._denseAdjacency), decoding the whole buffer.
+        :return: the list of node IDs by position, the offsets array and the
+        targets array.
+        """
+        numNodes = len(self.offsets) - 1
+        offsets = array('q', [0])
+        targets = array('q')
+        for position in range(numNodes):
+            targets.extend(self._adjacent(position))
+            offsets.append(len(targets))
+        return [self._id(position) for position in range(numNodes)], offsets, targets
+
+    def exportArrays(self):
+        """
+        Export the graph as flat arrays (see GraphBase.exportArrays); the
+        weights are all NaN.
+        :return: the list [ids, offsets, targets, weights].
+        """
+        ids, offsets, targets = self._denseAdjacency()
+        return [array('q', ids), offsets, targets, array('d', [float('nan')]) * len(targets)]
+
+    def _readOnly(self):
+        """
+        Refuse a mutation of the compressed graph.
+        :return: void.
+        """
+        raise Exception("Error: the graph is compressed (read-only)!")
+
+    def numEdges(self):
+        """
+        Return the number of edges.
+        :return: the number of edges.
+        """
+        return self.edgeCount
+
+    def addNode(self, elem):
+        """
+        Not supported: the graph is read-only.
+        """
+        self._readOnly()
+
+    def deleteNode(self, nodeId):
+        """
+        Not supported: the graph is read-only.
+        """
+        self._readOnly()
+
+    def insertEdge(self, tail, head, weight=None):
+        """
+        Not supported: the graph is read-only.
+        """
+        self._readOnly()
+
+    def deleteEdge(self, tail, head):
+        """
+        Not supported: the graph is read-only.
+        """
+        self._readOnly()
+
+    def getNode(self, id):
+        """
+        Return the node, if exists.
+        :param id: the node ID (integer).
+        :return: the node, if exists; None, otherwise.
+        """
+        return Node(id, id) if id in self.nodes else None
+
+    def getNodes(self):
+        """
+        Return the list of nodes.
+        :return: the list of nodes.
+        """
+        return [Node(nodeId, nodeId) for nodeId in self.nodes]
+
+    def getEdge(self, tail, head):
+        """
+        Return the node, if exists.
+        :param tail: the tail node ID (integer).
+        :param head: the head node ID (integer).
+        :return: the edge (without weight), if exists; None, otherwise.
+        """
+        return Edge(tail, head) if self.isAdj(tail, head) else None
+
+    def getEdges(self):
+        """
+        Return the list of edges.
+        :return: the list of edges.
+        """
+        edges = []
+        for position in range(len(self.offsets) - 1):
+            for target in self._adjacent(position):
+                # undirected edges are reported once, from the smallest position
+                if not self.undirected or target >= position:
+                    edges.append(Edge(self._id(position), self._id(target)))
+        return edges
+
+    def isAdj(self, tail, head):
+        """
+        Checks if two nodes ar adjacent.
+        :param tail: the tail node ID (integer).
+        :param head: the head node ID (integer).
+        :return: True, if the two nodes are adjacent; False, otherwise.
+        """
+        if tail not in self.nodes or head not in self.nodes:
+            return False
+        return self.nodes[head] in self._adjacent(self.nodes[tail])
+
+    def getAdj(self, nodeId):
+        """
+        Return all nodes adjacent to the one specified, by increasing
+        position.
+        :param nodeId: the node id.
+        :return: the list of nodes adjacent to the one specified.
+        """
+        if nodeId not in self.nodes:  # a range would accept the negative IDs as indexes
+            raise KeyError(nodeId)
+        adjacent = self._adjacent(self.nodes[nodeId])
+        if self.ids is None:
+            return adjacent
+        ids = self.ids
+        return [ids[target] for target in adjacent]
+
+    def deg(self, nodeId):
+        """
+        Return the node degree.
+        :param nodeId: the node id.
+        :return: the node degree.
+        """
+        if nodeId not in self.nodes:
+            return 0
+        return self._deg(self.nodes[nodeId])
+
+    def save(self, path):
+        """
+        Write the graph to a file: a header of GraphCompressed.HEADER int64,
+        the IDs (if not 0..n-1) and the offsets (int64), then the data.
+        :param path: the file path.
+        :return: void.
+        """
+        numNodes = len(self.offsets) - 1
+        header = array('q', [GraphCompressed.MAGIC, numNodes, self.dataSize(), self.edgeCount,
+                             int(self.undirected), int(self.ids is None)])
+        with open(path, "wb") as file:
+            header.tofile(file)
+            if self.ids is not None:
+                array('q', self.ids).tofile(file)
+            array('q', self.offsets).tofile(file)
+            file.write(self.data)
+
+    @classmethod
+    def load(cls, path, mapped=True):
+        """
+        Load a graph written by save().
+        :param path: the file path.
+        :param mapped: if True, the file is mapped in memory (mmap) and the
+        arrays are read from it without copies, until close() is called;
+        otherwise, the file is read into memory.
+        :return: the compressed graph.
+        """
+        with open(path, "rb") as file:
+            if mapped:
+                import mmap
+                mappedFile = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                buffer = memoryview(mappedFile)
+            else:
+                mappedFile = None
+                buffer = memoryview(file.read())
+
+        header = buffer[:8 * GraphCompressed.HEADER].cast('q')
+        magic, numNodes, dataSize, numEdges, undirected, identity = header.tolist()
+        header.release()
+        if magic != GraphCompressed.MAGIC:
+            buffer.release()
+            if mappedFile is not None:
+                mappedFile.close()
+            raise Exception("Error: {} does not contain a compressed graph!".format(path))
+
+        start = 8 * GraphCompressed.HEADER
+        ids = None
+        if not identity:
+            ids = buffer[start:start + 8 * numNodes].cast('q')
+            start += 8 * numNodes
+        offsets = buffer[start:start + 8 * (numNodes + 1)].cast('q')
+        start += 8 * (numNodes + 1)
+        data = buffer[start:start + dataSize]
+        buffer.release()
+
+        graph = cls(ids, offsets, data, bool(undirected), numEdges)
+        graph.file = mappedFile
+        return graph
+
+    def close(self):
+        """
+        Release the mapped file, if the graph has been loaded with mmap; the
+        graph cannot be used anymore.
+        :return: void.
+        """
+        if self.file is None:
+            return
+        for view in (self.ids, self.offsets, self.data):
+            if isinstance(view, memoryview):
+                view.release()
+        self.file.close()
+        self.file = None
+
+    def print(self):
+        """
+        Print the graph.
+        :return: void.
+        """
+        if self.isEmpty():
+            print("Compressed: EMPTY")
+            return
+
+        print("Compressed:")
+        for nodeId in self.nodes:
+            print("{}:{}".format(nodeId, self.getAdj(nodeId)))
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from graphFile.Graph_AdjacencyList import GraphAdjacencyList
+
+    source = GraphAdjacencyList(undirected=True)
+    for i in range(1000):
+        source.addNode(i)
+    for i in range(1000):
+        for step in (1, 2, 5, 300):  # close neighbours, plus a far one
+            source.insertEdge(i, (i + step) % 1000)
+
+    graph = GraphCompressed.fromGraph(source)
+    print("Edges: {}, data: {} bytes ({:.2f} bytes per entry, 8 in CSR)".format(
+        graph.numEdges(), graph.dataSize(), graph.dataSize() / (2 * graph.numEdges())))
+    print("Adjacent to 0:", graph.getAdj(0), "- degree:", graph.deg(0))
+
+    path = os.path.join(tempfile.mkdtemp(), "graph.rgvc")
+    graph.save(path)
+    loaded = GraphCompressed.load(path)
+    print("Loaded with mmap, adjacent to 999:", loaded.getAdj(999))
+    print("BFS from 0 visits", len(set(loaded.bfs(0))), "nodes")
+    loaded.close()
+    os.remove(path)
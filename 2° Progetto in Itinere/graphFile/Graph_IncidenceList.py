@@ -1,30 +1,146 @@
+from array import array
+from itertools import compress
+
 from graphFile.Graph import GraphBase
 from graphFile.base import Edge, Node
 
-from list.DoubleLinkedList import ListaDoppiamenteCollegata as List
-
 
 class GraphIncidenceList(GraphBase):
     """
     A graph, implemented as an incidence list.
-    Each node u has a list containing its incident edges (u,v).
+    Each node u has a list containing the IDs of its incident edges (u,v).
+    The edges are stored in an edge table made of the parallel arrays tail,
+    head and weight, addressed by edge ID; the Edge objects returned by the
+    methods are built on demand and they are not stored in the graph.
+    In undirected mode, the same edge ID is listed in the incidence lists of
+    both its endpoints.
+    The weight column is an array of floats: the integer and boolean
+    weights are stored as floats too, with a byte per edge recording their
+    type, so they are returned unchanged. The first weight of another type
+    (not a number, or an integer too large for a float) turns the column
+    into a plain list, that keeps every weight as it is.
     ---
     Memory Complexity: O(|V|+|E|)
     """
 
-    def __init__(self):
+    # type of the weights, by the code stored in the kind column
+    WEIGHT_TYPES = (float, int, bool)
+    # the integers with absolute value up to this bound are exact as floats
+    EXACT_INT = 2 ** 53
+
+    def __init__(self, undirected=False):
         """
         Constructor.
+        :param undirected: if True, the graph is undirected.
+        """
+        super().__init__(undirected)
+        self.inc = {} # incidence lists {nodeID:arrayOfIncidentEdgeIDs}
+
+        # edge table {edgeID: (tail, head, weight)}, a missing weight is NaN
+        self.tail = array('q')
+        self.head = array('q')
+        self.weight = array('d')  # a list, as soon as a weight is not a number
+        self.kind = bytearray()  # index in WEIGHT_TYPES of the type of each weight
+        self.alive = bytearray()  # 1 if the edge ID is in use; 0, otherwise
+        self.freeEdges = []  # IDs of deleted edges, reused by insertEdge
+
+    def _opposite(self, edgeId, nodeId):
+        """
+        Return the endpoint of the edge opposite to the specified node.
+        :param edgeId: the edge ID (integer).
+        :param nodeId: the node id (one of the endpoints of the edge).
+        :return: the other endpoint of the edge.
+        """
+        return self.tail[edgeId] if self.head[edgeId] == nodeId else self.head[edgeId]
+
+    def _leadsTo(self, edgeId, tail, head):
+        """
+        Checks if an edge of the incidence list of tail leads to head.
+        :param edgeId: the edge ID, taken from the incidence list of tail.
+        :param tail: the tail node ID (integer).
+        :param head: the head node ID (integer).
+        :return: True, if the edge connects tail to head; False, otherwise.
+        """
+        if self.undirected:
+            return self._opposite(edgeId, tail) == head
+        return self.head[edgeId] == head
+
+    def _findEdge(self, tail, head):
+        """
+        Return the ID of the edge (tail,head), if exists.
+        :param tail: the tail node ID (integer).
+        :param head: the head node ID (integer).
+        :return: the edge ID, if exists; None, otherwise.
+        """
+        for edgeId in self.inc[tail]:
+            if self._leadsTo(edgeId, tail, head):
+                return edgeId
+        return None
+
+    def _toEdge(self, edgeId):
+        """
+        Build the Edge object of the specified edge ID.
+        :param edgeId: the edge ID (integer).
+        :return: the edge.
+        """
+        weight = self._weightOf(edgeId)
+        return Edge(self.tail[edgeId], self.head[edgeId],
+                    None if weight != weight else weight)
+
+    def _weightOf(self, edgeId):
+        """
+        Return the weight of an edge, with its original type.
+        :param edgeId: the edge ID (integer).
+        :return: the weight (NaN, if missing).
+        """
+        kind = self.kind[edgeId]
+        weight = self.weight[edgeId]
+        return GraphIncidenceList.WEIGHT_TYPES[kind](weight) if kind else weight
+
+    def _setWeight(self, edgeId, weight):
+        """
+        Store the weight of an edge in the weight column (appending it, if
+        the edge ID is new), switching the column to a plain list if the
+        weight cannot be stored as a float.
+        :param edgeId: the edge ID (integer).
+        :param weight: the weight (None, if missing).
+        :return: void.
+        """
+        kind = 0
+        if weight is None:
+            weight = float('nan')
+        elif isinstance(self.weight, array) and type(weight) is not float:
+            if type(weight) in GraphIncidenceList.WEIGHT_TYPES and abs(weight) <= GraphIncidenceList.EXACT_INT:
+                kind = GraphIncidenceList.WEIGHT_TYPES.index(type(weight))
+                weight = float(weight)
+            else:
+                # keep every weight as it is, from now on
+                self.weight = [self._weightOf(i) for i in range(len(self.weight))]
+                self.kind = bytearray(len(self.kind))
+        if edgeId == len(self.weight):
+            self.weight.append(weight)
+            self.kind.append(kind)
+        else:
+            self.weight[edgeId] = weight
+            self.kind[edgeId] = kind
+
+    def _freeEdge(self, edgeId):
         """
-        super().__init__()
-        self.inc = {} # incidence lists {nodeID:listOfIncidentEdges}
+        Release the slot of the edge table used by the specified edge.
+        :param edgeId: the edge ID (integer).
+        :return: void.
+        """
+        self.alive[edgeId] = 0
+        self.weight[edgeId] = float('nan')
+        self.kind[edgeId] = 0
+        self.freeEdges.append(edgeId)
 
     def numEdges(self):
         """
         Return the number of edges.
         :return: the number of edges.
         """
-        return sum(len(adj_list) for adj_list in self.inc.values())
+        return len(self.alive) - len(self.freeEdges)
 
     def addNode(self, elem):
         """
@@ -35,7 +151,8 @@ class GraphIncidenceList(GraphBase):
         newnode = super().addNode(elem) # create a new node with the correct ID
 
         self.nodes[newnode.id] = newnode # add the new node to the dictionary
-        self.inc[newnode.id] = List() # create the incidence list for the new node
+        self.inc[newnode.id] = array('q') # create the incidence list for the new node
+        self._nodeAdded(newnode.id)
 
         return newnode
 
@@ -45,32 +162,36 @@ class GraphIncidenceList(GraphBase):
         :param nodeId: the node ID (integer).
         :return: void.
         """
-        # look for the node
-        found = False
-        for node in self.nodes.items():
-            if index == node[0]:
-                found = True
-                break
-
         # if node does not exist, return
-        if not found: return
+        if index not in self.nodes:
+            return
 
         # remove the node from the set of nodes, that is to remove the node
         # from the dictionary nodes
         del self.nodes[index]
+        self._nodeRemoved(index)
 
         # remove all edges starting from the node, that is to remove the
         # incidence list for the node
-        del self.inc[index]
+        incident = self.inc.pop(index)
+        for edgeId in set(incident):
+            neighbour = self._opposite(edgeId, index)
+            if self.undirected and neighbour != index:
+                self.inc[neighbour].remove(edgeId)
+                self._degreeChanged(neighbour, -1)
+            self._freeEdge(edgeId)
 
         # remove all edges pointing to the node, that is to remove all the edges
         # with the node as head from all the incidence lists
-        for inc in self.inc.values():
-            curr = inc.getFirstRecord()
-            while curr is not None:
-                if curr.elem.head == index:
-                    inc.deleteRecord(curr)
-                curr = curr.next
+        if not self.undirected:
+            for nodeId, inc in self.inc.items():
+                pointing = [edgeId for edgeId in inc if self.head[edgeId] == index]
+                if len(pointing) > 0:
+                    self.inc[nodeId] = array('q', (edgeId for edgeId in inc
+                                                   if self.head[edgeId] != index))
+                    for edgeId in pointing:
+                        self._freeEdge(edgeId)
+                    self._degreeChanged(nodeId, -len(pointing))
 
     def getNode(self, id):
         """
@@ -92,12 +213,33 @@ class GraphIncidenceList(GraphBase):
         Add a new edge.
         :param tail: the tail node ID (integer).
         :param head: the head node ID (integer).
-        :param weight: the (optional) edge weight (floating-point).
+        :param weight: the (optional) edge weight (a number, or any object).
         :return: the created edge, if created; None, otherwise.
         """
-        # if tail and head exist, add the entry into the incidence list
-        if head in self.nodes and tail in self.nodes: #TODO overwrite if edge already exists
-            self.inc[tail].addAsLast(Edge(tail, head, weight))
+        # if tail or head do not exist, return
+        if head not in self.nodes or tail not in self.nodes: #TODO overwrite if edge already exists
+            return None
+
+        # store the edge into the edge table, reusing a free slot if any
+        if len(self.freeEdges) > 0:
+            edgeId = self.freeEdges.pop()
+            self.tail[edgeId] = tail
+            self.head[edgeId] = head
+            self.alive[edgeId] = 1
+        else:
+            edgeId = len(self.alive)
+            self.tail.append(tail)
+            self.head.append(head)
+            self.alive.append(1)
+        self._setWeight(edgeId, weight)
+
+        # add the edge ID into the incidence list(s)
+        self.inc[tail].append(edgeId)
+        self._degreeChanged(tail, 1)
+        if self.undirected and tail != head:
+            self.inc[head].append(edgeId)  # the same edge ID
+            self._degreeChanged(head, 1)
+        return self._toEdge(edgeId)
 
     def deleteEdge(self, tail, head):
         """
@@ -108,12 +250,16 @@ class GraphIncidenceList(GraphBase):
         """
         # if tail and head exist, delete the edge
         if tail in self.nodes and head in self.nodes:
-            curr = self.inc[tail].getFirstRecord()
-            while curr is not None:
-                if curr.elem.head == head:
-                    self.inc[tail].deleteRecord(curr)
-                    break
-                curr = curr.next
+            edgeId = self._findEdge(tail, head)
+            if edgeId is None:
+                return
+            self.inc[tail].remove(edgeId)
+            self._degreeChanged(tail, -1)
+            # remove the shared edge from the incidence list of the head too
+            if self.undirected and tail != head:
+                self.inc[head].remove(edgeId)
+                self._degreeChanged(head, -1)
+            self._freeEdge(edgeId)
 
     def getEdge(self, tail, head):
         """
@@ -123,11 +269,9 @@ class GraphIncidenceList(GraphBase):
         :return: the edge, if exists; None, otherwise.
         """
         if tail in self.nodes and head in self.nodes:
-            curr = self.inc[tail].getFirstRecord()
-            while curr is not None:
-                if curr.elem.head == head:
-                    return curr.elem
-                curr = curr.next
+            edgeId = self._findEdge(tail, head)
+            if edgeId is not None:
+                return self._toEdge(edgeId)
         return None
 
     def getEdges(self):
@@ -135,13 +279,31 @@ class GraphIncidenceList(GraphBase):
         Return the list of edges.
         :return: the list of edges.
         """
-        edges = []
-        for inc_val in self.inc.values():
-            curr = inc_val.getFirstRecord()
-            while curr is not None:
-                edges.append(curr.elem)
-                curr = curr.next
-        return edges
+        # each edge is stored once in the edge table, also if undirected
+        return [self._toEdge(edgeId) for edgeId in compress(range(len(self.alive)), self.alive)]
+
+    def totalWeight(self):
+        """
+        Return the sum of the weights of the edges (edges without weight are
+        ignored); the weights must be numbers.
+        :return: the total weight.
+        """
+        # free slots and missing weights are NaN, so they are skipped
+        return sum(w for w in self.weight if w == w)
+
+    def getEdgesByWeight(self, minWeight=None, maxWeight=None):
+        """
+        Return the list of edges with weight in the specified range; the
+        weights must be comparable with the bounds.
+        :param minWeight: the (optional) minimum weight, included.
+        :param maxWeight: the (optional) maximum weight, included.
+        :return: the list of edges.
+        """
+        low = float('-inf') if minWeight is None else minWeight
+        high = float('inf') if maxWeight is None else maxWeight
+        # NaN never satisfies the comparison: free slots are filtered out
+        selected = [low <= w <= high for w in self.weight]
+        return [self._toEdge(edgeId) for edgeId in compress(range(len(self.weight)), selected)]
 
     def isAdj(self, tail, head):
         """
@@ -152,12 +314,7 @@ class GraphIncidenceList(GraphBase):
         """
         # if tail and head exist, look for the entry in the incidence list
         if super().isAdj(tail, head) == True:
-            curr = self.inc[tail].getFirstRecord()
-            while curr is not None:
-                edge = curr.elem
-                if edge.head == head:
-                    return True
-                curr = curr.next
+            return self._findEdge(tail, head) is not None
 
         # else, return False
         return False
@@ -168,12 +325,10 @@ class GraphIncidenceList(GraphBase):
         :param nodeId: the node id.
         :return: the list of nodes adjacent to the one specified.
         """
-        result = []
-        curr = self.inc[nodeId].getFirstRecord()
-        while curr is not None:
-            result.append(curr.elem.head)
-            curr = curr.next
-        return result
+        if self.undirected:
+            return [self._opposite(edgeId, nodeId) for edgeId in self.inc[nodeId]]
+        head = self.head
+        return [head[edgeId] for edgeId in self.inc[nodeId]]
 
     def deg(self, nodeId):
         """
@@ -186,6 +341,44 @@ class GraphIncidenceList(GraphBase):
         else:
             return len(self.inc[nodeId])
 
+    def exportArrays(self):
+        """
+        Export the graph as flat arrays (see GraphBase.exportArrays), reading
+        the heads and the weights directly from the edge table (the weights
+        that are not numbers are exported as NaN).
+        ---
+        Time Complexity: O(|V|+|E|)
+        :return: the list [ids, offsets, targets, weights].
+        """
+        ids = array('q', self.nodes)
+        position = {ids[i]: i for i in range(len(ids))}
+        offsets = array('q', [0])
+        targets = array('q')
+        weights = array('d')
+        weight = self.weight
+        if not isinstance(weight, array):
+            nan = float('nan')
+            weight = array('d', (w if isinstance(w, (int, float)) and abs(w) <= GraphIncidenceList.EXACT_INT
+                                 else nan for w in weight))
+        for nodeId in ids:
+            incident = self.inc[nodeId]
+            targets.extend(position[adj_node] for adj_node in self.getAdj(nodeId))
+            weights.extend(weight[edgeId] for edgeId in incident)
+            offsets.append(len(targets))
+        return [ids, offsets, targets, weights]
+
+    def _pickleState(self):
+        """
+        Return the state that the exported arrays do not keep (see
+        GraphBase._pickleState): if the weights are not all floats, the
+        exact weights, in the order of the exported entries.
+        :return: the dictionary of the state.
+        """
+        state = super()._pickleState()
+        if not isinstance(self.weight, array) or any(self.kind):
+            state["weights"] = [self._weightOf(edgeId) for nodeId in self.nodes for edgeId in self.inc[nodeId]]
+        return state
+
     def print(self):
         """
         Print the graph.
@@ -199,7 +392,8 @@ class GraphIncidenceList(GraphBase):
         # else ...
         print("Incidence Lists:")
         for inc_item in self.inc.items():
-            print("{}:{}".format(inc_item[0], inc_item[1]))
+            print("{}:[{}]".format(inc_item[0], ", ".join(
+                str(self._toEdge(edgeId)) for edgeId in inc_item[1])))
 
 if __name__ == "__main__":
     graph = GraphIncidenceList()
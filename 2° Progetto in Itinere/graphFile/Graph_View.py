@@ -0,0 +1,221 @@
+from graphFile.Graph import GraphBase
+from graphFile.base import Edge
+
+
+class GraphView(GraphBase):
+    """
+    A read-only view of the subgraph induced by a set of nodes of another
+    graph (the parent, any backend). Nothing is copied: the adjacency is
+    read from the parent and filtered on the fly, so the view always shows
+    the current edges of the parent among its nodes.
+    All the algorithms of GraphBase run on the view as on a graph; use
+    materialize() to get an independent copy.
+    """
+
+    def __init__(self, parent, nodeIds):
+        """
+        Constructor.
+        :param parent: the viewed graph.
+        :param nodeIds: the IDs of the nodes of the view (the IDs missing in
+        the parent are ignored).
+        """
+        super().__init__(parent.undirected)
+        self.parent = parent
+        # {nodeId: node}, the nodes are shared with the parent
+        self.nodes = {nodeId: parent.getNode(nodeId) for nodeId in nodeIds if nodeId in parent.nodes}
+        self.nextId = parent.nextId
+
+    @property
+    def version(self):
+        """
+        Return the version of the parent: the view changes with it.
+        :return: the version of the parent.
+        """
+        return self.parent.version
+
+    @version.setter
+    def version(self, value):
+        """
+        Ignore the version set by GraphBase: the view has no version of its own.
+        :param value: the version.
+        :return: void.
+        """
+
+    def _readOnly(self):
+        """
+        Refuse a mutation of the view.
+        :return: void.
+        """
+        raise Exception("Error: the view is read-only, mutate the parent graph!")
+
+    def numEdges(self):
+        """
+        Return the number of edges among the nodes of the view.
+        :return: the number of edges.
+        """
+        if not self.undirected:
+            return sum(len(self.getAdj(nodeId)) for nodeId in self.nodes)
+        # each undirected edge is seen from both endpoints, apart from self-loops
+        entries = loops = 0
+        for nodeId in self.nodes:
+            adjacent = self.getAdj(nodeId)
+            entries += len(adjacent)
+            loops += adjacent.count(nodeId)
+        return (entries + loops) // 2
+
+    def addNode(self, elem):
+        """
+        Not supported: the view is read-only.
+        """
+        self._readOnly()
+
+    def deleteNode(self, nodeId):
+        """
+        Not supported: the view is read-only.
+        """
+        self._readOnly()
+
+    def insertEdge(self, tail, head, weight=None):
+        """
+        Not supported: the view is read-only.
+        """
+        self._readOnly()
+
+    def deleteEdge(self, tail, head):
+        """
+        Not supported: the view is read-only.
+        """
+        self._readOnly()
+
+    def getNode(self, id):
+        """
+        Return the node, if exists.
+        :param id: the node ID (integer).
+        :return: the node, if exists; None, otherwise.
+        """
+        return self.nodes.get(id)
+
+    def getNodes(self):
+        """
+        Return the list of nodes.
+        :return: the list of nodes.
+        """
+        return list(self.nodes.values())
+
+    def getEdge(self, tail, head):
+        """
+        Return the node, if exists.
+        :param tail: the tail node ID (integer).
+        :param head: the head node ID (integer).
+        :return: the edge, if exists; None, otherwise.
+        """
+        if tail not in self.nodes or head not in self.nodes:
+            return None
+        return self.parent.getEdge(tail, head)
+
+    def getEdges(self):
+        """
+        Return the list of edges among the nodes of the view.
+        :return: the list of edges.
+        """
+        edges = []
+        for nodeId in self.nodes:
+            for adj_node in self.getAdj(nodeId):
+                # undirected edges are reported once, from the smallest ID
+                if not self.undirected or adj_node >= nodeId:
+                    edge = self.parent.getEdge(nodeId, adj_node)
+                    edges.append(Edge(nodeId, adj_node, None if edge is None else edge.weight))
+        return edges
+
+    def isAdj(self, tail, head):
+        """
+        Checks if two nodes ar adjacent.
+        :param tail: the tail node ID (integer).
+        :param head: the head node ID (integer).
+        :return: True, if the two nodes are adjacent; False, otherwise.
+        """
+        return tail in self.nodes and head in self.nodes and self.parent.isAdj(tail, head)
+
+    def getAdj(self, nodeId):
+        """
+        Return all nodes of the view adjacent to the one specified.
+        :param nodeId: the node id.
+        :return: the list of nodes adjacent to the one specified.
+        """
+        nodes = self.nodes
+        if nodeId not in nodes:
+            return []
+        return [adj_node for adj_node in self.parent.getAdj(nodeId) if adj_node in nodes]
+
+    def deg(self, nodeId):
+        """
+        Return the node degree in the view.
+        :param nodeId: the node id.
+        :return: the node degree.
+        """
+        if nodeId not in self.nodes:
+            return 0
+        return len(self.getAdj(nodeId))
+
+    def materialize(self, backend=None):
+        """
+        Copy the view into an independent graph.
+        :param backend: the class of the new graph (the class of the parent,
+        if missing); a frozen GraphCSR parent gives a GraphCSR.
+        :return: the new graph.
+        """
+        if backend is None:
+            root = self.parent
+            while isinstance(root, GraphView):  # a view of a view
+                root = root.parent
+            backend = type(root)
+        return self.convert(backend)
+
+    @classmethod
+    def fromArrays(cls, ids, offsets, targets, weights=None, undirected=False):
+        """
+        Not supported: a view needs a parent graph.
+        """
+        raise Exception("Error: a view cannot be built from arrays, use a graph backend!")
+
+    def __reduce_ex__(self, protocol):
+        """
+        Pickle the view together with its parent graph.
+        :param protocol: the pickle protocol.
+        :return: the reconstruction function and its arguments.
+        """
+        return GraphView, (self.parent, list(self.nodes))
+
+    def print(self):
+        """
+        Print the graph.
+        :return: void.
+        """
+        if self.isEmpty():
+            print("View: EMPTY")
+            return
+
+        print("View:")
+        for nodeId in self.nodes:
+            print("{}:{}".format(nodeId, self.getAdj(nodeId)))
+
+
+if __name__ == "__main__":
+    from graphFile.Graph_AdjacencyList import GraphAdjacencyList
+
+    graph = GraphAdjacencyList(undirected=True)
+    for i in range(10):
+        graph.addNode(i)
+    for tail, head in [(0, 1), (1, 2), (2, 3), (3, 4), (5, 6), (6, 7), (7, 8), (6, 9)]:
+        graph.insertEdge(tail, head)
+
+    print("Components:", graph.connectedComponents())
+    for view in graph.componentViews():
+        print("Component {}: {} nodes, {} edges, medium nodes {}".format(
+            list(view.nodes), view.numNodes(), view.numEdges(), view.mediumNode()))
+
+    view = graph.subgraphView([1, 2, 3, 6, 7])
+    view.print()
+    copy = view.materialize()
+    copy.insertEdge(1, 3)
+    print("Edges of the copy:", copy.numEdges(), "- edges of the view:", view.numEdges())
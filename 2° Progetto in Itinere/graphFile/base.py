@@ -3,6 +3,8 @@ class Node:
     The graph basic element: node.
     """
 
+    __slots__ = ('id', 'value', 'distanza')
+
     def __init__(self, id, value, distanza=0):
         """
         Constructor.
@@ -34,6 +36,8 @@ class Edge:
     The graph basic element: (weighted) edge.
     """
 
+    __slots__ = ('head', 'tail', 'weight')
+
     def __init__(self, tail, head, weight=None):
         """
         Constructor.
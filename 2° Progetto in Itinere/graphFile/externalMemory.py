@@ -0,0 +1,343 @@
+from array import array
+from itertools import accumulate
+import heapq
+import os
+import tempfile
+
+# The edge files are binary: a sequence of (tail, head) records of two int64
+# (native byte order), sorted by tail and then by head, without duplicates.
+# Node IDs are non-negative integers; an undirected edge is stored in both
+# directions, so the adjacency of every node is a contiguous range of records.
+RECORD = 16  # bytes per edge record
+BLOCK = 1 << 16  # records read or written at once
+RUN = 1 << 20  # records sorted in memory at once
+
+
+def _readRecords(path, width, blockSize=BLOCK):
+    """
+    Read a binary file of int64 records with large sequential reads.
+    :param path: the file path.
+    :param width: the number of int64 per record.
+    :param blockSize: the number of records per read.
+    :return: a generator of tuples of width integers.
+    """
+    with open(path, "rb") as file:
+        while True:
+            data = file.read(8 * width * blockSize)
+            if len(data) == 0:
+                return
+            block = array('q')
+            block.frombytes(data)
+            yield from zip(*[iter(block)] * width)
+
+
+def _writeRuns(records, width, runSize, directory):
+    """
+    Split a stream of records in sorted runs, each one written to a
+    temporary file.
+    :param records: iterable of tuples of width integers.
+    :param width: the number of int64 per record.
+    :param runSize: the number of records sorted in memory at once.
+    :param directory: the directory of the run files.
+    :return: the list of paths of the run files.
+    """
+    paths = []
+    run = []
+
+    def flush():
+        run.sort()
+        fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+        with os.fdopen(fd, "wb") as file:
+            for start in range(0, len(run), BLOCK):
+                block = array('q')
+                for record in run[start:start + BLOCK]:
+                    block.extend(record)
+                block.tofile(file)
+        paths.append(path)
+        run.clear()
+
+    for record in records:
+        run.append(record)
+        if len(run) >= runSize:
+            flush()
+    if len(run) > 0:
+        flush()
+    return paths
+
+
+def _mergeRuns(paths, width, output, blockSize=BLOCK):
+    """
+    Merge sorted run files into a single sorted file, dropping the
+    duplicated records; the run files are removed.
+    :param paths: the paths of the run files.
+    :param width: the number of int64 per record.
+    :param output: the path of the merged file.
+    :param blockSize: the number of records per read and per write.
+    :return: the number of records written.
+    """
+    written = 0
+    previous = None
+    block = array('q')
+    with open(output, "wb") as file:
+        for record in heapq.merge(*[_readRecords(path, width, blockSize) for path in paths]):
+            if record == previous:
+                continue
+            previous = record
+            block.extend(record)
+            written += 1
+            if len(block) >= width * blockSize:
+                block.tofile(file)
+                block = array('q')
+        block.tofile(file)
+    for path in paths:
+        os.remove(path)
+    return written
+
+
+def writeEdgeFile(edges, path, undirected=False, runSize=RUN, tempDir=None):
+    """
+    Write a stream of edges as a sorted binary edge file, with an external
+    merge sort: sorted runs of runSize edges are spilled to temporary files
+    and merged with a k-way merge, so the stream can be larger than the
+    memory.
+    ---
+    Time Complexity: O(|E| log |E|)
+    Memory Complexity: O(runSize)
+    :param edges: iterable of (tail, head) or (tail, head, weight) tuples
+    (the weights are not stored).
+    :param path: the path of the edge file.
+    :param undirected: if True, each edge is written in both directions.
+    :param runSize: the number of edges sorted in memory at once.
+    :param tempDir: the directory of the temporary files (the directory of
+    the system, if missing).
+    :return: the list [number of records, number of nodes], where the
+    number of nodes is the largest node ID plus one.
+    """
+    largest = [-1]
+
+    def records():
+        for edge in edges:
+            tail, head = edge[0], edge[1]
+            if tail > largest[0] or head > largest[0]:
+                largest[0] = max(tail, head)
+            yield tail, head
+            if undirected and tail != head:
+                yield head, tail
+
+    with tempfile.TemporaryDirectory(dir=tempDir) as directory:
+        written = _mergeRuns(_writeRuns(records(), 2, runSize, directory), 2, path)
+    return [written, largest[0] + 1]
+
+
+def readEdges(path, blockSize=BLOCK):
+    """
+    Read an edge file with large sequential reads.
+    :param path: the path of the edge file.
+    :param blockSize: the number of records per read.
+    :return: a generator of (tail, head) tuples.
+    """
+    return _readRecords(path, 2, blockSize)
+
+
+def countNodes(path, blockSize=BLOCK):
+    """
+    Return the number of nodes of an edge file (the largest node ID plus
+    one), with a sequential scan.
+    :param path: the path of the edge file.
+    :param blockSize: the number of records per read.
+    :return: the number of nodes.
+    """
+    largest = -1
+    with open(path, "rb") as file:
+        while True:
+            data = file.read(RECORD * blockSize)
+            if len(data) == 0:
+                return largest + 1
+            block = array('q')
+            block.frombytes(data)
+            largest = max(largest, max(block))
+
+
+def _nodeArray(numNodes, value, path=None):
+    """
+    Allocate an int64 array with one entry per node.
+    :param numNodes: the number of nodes.
+    :param value: the initial value of the entries, or None for the node
+    IDs 0..n-1.
+    :param path: if given, the array is a memoryview of this file, mapped in
+    memory (mmap); otherwise, it is resident in memory.
+    :return: the array (or the memoryview).
+    """
+    def chunks():
+        for start in range(0, numNodes, BLOCK):
+            count = min(BLOCK, numNodes - start)
+            yield array('q', range(start, start + count)) if value is None else array('q', [value]) * count
+
+    if path is None:
+        return array('q', range(numNodes)) if value is None else array('q', [value]) * numNodes
+
+    import mmap
+    with open(path, "w+b") as file:
+        for chunk in chunks():
+            chunk.tofile(file)
+        file.flush()
+        if numNodes == 0:
+            return memoryview(bytearray()).cast('q')
+        # the view keeps the mapping open until it is released
+        return memoryview(mmap.mmap(file.fileno(), 8 * numNodes)).cast('q')
+
+
+def externalConnectedComponents(path, numNodes=None, labelPath=None, blockSize=BLOCK):
+    """
+    Compute the connected components of the graph of an edge file (the
+    weakly connected ones, if the edges are directed) with a single
+    sequential scan: only the union-find array stays in memory, or in a
+    memory-mapped file. Each component is labelled with its smallest node
+    ID, and every ID 0..n-1 is a node (the IDs without edges are isolated).
+    ---
+    Time Complexity: O(|E| log |V|)
+    Memory Complexity: O(|V|), 8 bytes per node
+    :param path: the path of the edge file.
+    :param numNodes: the number of nodes (computed with a scan, if missing).
+    :param labelPath: if given, the labels are stored in this file, mapped
+    in memory.
+    :param blockSize: the number of records per read.
+    :return: the array of the labels, indexed by node ID (a memoryview of
+    the mapped file, if labelPath is given).
+    """
+    if numNodes is None:
+        numNodes = countNodes(path, blockSize)
+    father = _nodeArray(numNodes, None, labelPath)
+
+    def find(node):
+        while father[node] != node:  # path halving
+            father[node] = father[father[node]]
+            node = father[node]
+        return node
+
+    for tail, head in readEdges(path, blockSize):
+        first, second = find(tail), find(head)
+        if first != second:
+            # the root is the smallest ID: father[node] <= node always
+            father[max(first, second)] = min(first, second)
+
+    # the fathers precede their children: one pass resolves all the labels
+    for node in range(numNodes):
+        father[node] = father[father[node]]
+    return father
+
+
+def _edgeIndex(path, numNodes, blockSize=BLOCK):
+    """
+    Compute the offsets of the adjacency ranges of an edge file: the
+    records with tail v are the records offsets[v]..offsets[v+1]-1.
+    :param path: the path of the edge file.
+    :param numNodes: the number of nodes.
+    :param blockSize: the number of records per read.
+    :return: the offsets array (numNodes+1 entries).
+    """
+    counts = array('q', bytes(8 * (numNodes + 1)))
+    with open(path, "rb") as file:
+        while True:
+            data = file.read(RECORD * blockSize)
+            if len(data) == 0:
+                break
+            block = array('q')
+            block.frombytes(data)
+            for tail in block[0::2]:
+                counts[tail + 1] += 1
+    return array('q', accumulate(counts))
+
+
+def externalBfs(path, rootId, numNodes=None, distancePath=None, blockSize=BLOCK, runSize=RUN, tempDir=None):
+    """
+    Execute a level-synchronous BFS on the graph of an edge file. Only the
+    distances (and the offsets of the adjacency ranges) stay in memory, or
+    in a memory-mapped file. The frontier of each level is a sorted file of
+    node IDs: its adjacency ranges are read in increasing order, so the
+    edge file is read forward, and the discovered nodes are spilled in
+    sorted runs, merged into the file of the next frontier.
+    ---
+    Time Complexity: O(|V| log |V| + |E|)
+    Memory Complexity: O(|V|), 16 bytes per node, plus O(runSize)
+    :param path: the path of the edge file.
+    :param rootId: the root node ID (integer).
+    :param numNodes: the number of nodes (computed with a scan, if missing).
+    :param distancePath: if given, the distances are stored in this file,
+    mapped in memory.
+    :param blockSize: the number of records per read.
+    :param runSize: the number of discovered nodes sorted in memory at once.
+    :param tempDir: the directory of the temporary files (the directory of
+    the system, if missing).
+    :return: the array of the distances from the root, indexed by node ID
+    (-1 for the unreached nodes; a memoryview of the mapped file, if
+    distancePath is given), or None if the root does not exist.
+    """
+    if numNodes is None:
+        numNodes = countNodes(path, blockSize)
+    if rootId < 0 or rootId >= numNodes:
+        return None
+
+    offsets = _edgeIndex(path, numNodes, blockSize)
+    distance = _nodeArray(numNodes, -1, distancePath)
+    distance[rootId] = 0
+
+    with tempfile.TemporaryDirectory(dir=tempDir) as directory, open(path, "rb") as edgeFile:
+        frontier = os.path.join(directory, "frontier0")
+        with open(frontier, "wb") as file:
+            array('q', [rootId]).tofile(file)
+        level = 0
+        size = 1
+
+        while size > 0:
+            level += 1
+
+            def discovered():
+                for (node,) in _readRecords(frontier, 1, blockSize):
+                    start, end = offsets[node], offsets[node + 1]
+                    edgeFile.seek(RECORD * start)
+                    while start < end:  # large adjacency ranges are read in blocks
+                        count = min(blockSize, end - start)
+                        block = array('q')
+                        block.frombytes(edgeFile.read(RECORD * count))
+                        for head in block[1::2]:
+                            if distance[head] == -1:
+                                distance[head] = level
+                                yield (head,)
+                        start += count
+
+            runs = _writeRuns(discovered(), 1, runSize, directory)
+            os.remove(frontier)
+            frontier = os.path.join(directory, "frontier{}".format(level))
+            size = _mergeRuns(runs, 1, frontier, blockSize)
+
+    return distance
+
+
+if __name__ == "__main__":
+    import random
+
+    random.seed(1)
+    numNodes = 2000
+    edges = [(random.randrange(numNodes), random.randrange(numNodes)) for _ in range(1500)]
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "edges.bin")
+
+    # small runs, to exercise the external sort
+    records, numNodes = writeEdgeFile(edges, path, undirected=True, runSize=500)
+    print("Records: {}, nodes: {}, file: {} bytes".format(records, numNodes, os.path.getsize(path)))
+
+    labels = externalConnectedComponents(path, numNodes)
+    sizes = {}
+    for label in labels:
+        sizes[label] = sizes.get(label, 0) + 1
+    print("Components: {}, largest: {} nodes".format(len(sizes), max(sizes.values())))
+
+    distance = externalBfs(path, edges[0][0], numNodes, os.path.join(directory, "distance.bin"), runSize=100)
+    reached = [d for d in distance if d >= 0]
+    print("BFS from {}: {} nodes reached, eccentricity {}".format(edges[0][0], len(reached), max(reached)))
+    distance.release()
+
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
@@ -0,0 +1,283 @@
+from graphFile.Graph_AdjacencyList import GraphAdjacencyList
+
+
+class LabelIndex:
+    """
+    Interning table that maps external hashable labels (strings, tuples,
+    ...) to dense integer IDs 0, 1, 2, ... and back.
+    Removing a label leaves a tombstone: its ID is never reused, so the IDs
+    of the other labels do not change.
+    ---
+    Time Complexity: O(1) for every operation
+    """
+
+    TOMBSTONE = object()  # placeholder of the removed labels
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        self.ids = {}  # {label: id}
+        self.labels = []  # label of each id (LabelIndex.TOMBSTONE if removed)
+
+    def __len__(self):
+        """
+        Return the number of labels (removed labels excluded).
+        :return: the number of labels.
+        """
+        return len(self.ids)
+
+    def __contains__(self, label):
+        """
+        Check if a label has been interned (and not removed).
+        :param label: the label.
+        :return: True, if the label exists; False, otherwise.
+        """
+        return label in self.ids
+
+    def intern(self, label):
+        """
+        Return the ID of a label, assigning a new one if the label is new.
+        :param label: the label (hashable).
+        :return: the label ID.
+        """
+        labelId = self.ids.get(label)
+        if labelId is None:
+            labelId = len(self.labels)
+            self.ids[label] = labelId
+            self.labels.append(label)
+        return labelId
+
+    def internAll(self, labels):
+        """
+        Intern many labels at once.
+        :param labels: iterable of labels.
+        :return: the list of label IDs, in the same order.
+        """
+        return [self.intern(label) for label in labels]
+
+    def id(self, label):
+        """
+        Return the ID of a label, without interning it.
+        :param label: the label.
+        :return: the label ID, if exists; None, otherwise.
+        """
+        return self.ids.get(label)
+
+    def label(self, labelId):
+        """
+        Return the label of an ID.
+        :param labelId: the label ID.
+        :return: the label, if exists; None, otherwise.
+        """
+        if labelId is None or labelId < 0 or labelId >= len(self.labels):
+            return None
+        label = self.labels[labelId]
+        return None if label is LabelIndex.TOMBSTONE else label
+
+    def remove(self, label):
+        """
+        Remove a label, leaving a tombstone in place of its ID.
+        :param label: the label.
+        :return: the ID of the removed label, if existed; None, otherwise.
+        """
+        labelId = self.ids.pop(label, None)
+        if labelId is not None:
+            self.labels[labelId] = LabelIndex.TOMBSTONE
+        return labelId
+
+
+class LabelledGraph:
+    """
+    A graph whose nodes are identified by arbitrary hashable labels.
+    The labels are interned by a LabelIndex and the wrapped graph (any
+    backend) only sees the dense integer IDs.
+    """
+
+    def __init__(self, graph=None):
+        """
+        Constructor.
+        :param graph: the (empty) wrapped graph; an undirected
+        GraphAdjacencyList, if missing.
+        """
+        self.graph = GraphAdjacencyList(undirected=True) if graph is None else graph
+        self.index = LabelIndex()
+
+    def _ids(self, *labels):
+        """
+        Return the IDs of some labels, if they all exist.
+        :param labels: the labels.
+        :return: the list of IDs; None, if a label does not exist.
+        """
+        ids = [self.index.id(label) for label in labels]
+        return None if None in ids else ids
+
+    def addNode(self, label):
+        """
+        Add a new node with the specified label; if the label already
+        exists, its node is left unchanged.
+        :param label: the node label.
+        :return: the created node (its ID is the interned label ID), or the
+        existing node of the label.
+        """
+        labelId = self.index.id(label)
+        if labelId is not None:
+            return self.graph.getNode(labelId)
+        return self.graph.addNode(self.index.intern(label))
+
+    def addNodes(self, labels):
+        """
+        Add many nodes at once (see addNode).
+        :param labels: iterable of node labels.
+        :return: the list of created (or existing) nodes.
+        """
+        return [self.addNode(label) for label in labels]
+
+    def deleteNode(self, label):
+        """
+        Remove the specified node; its ID becomes a tombstone.
+        :param label: the node label.
+        :return: void.
+        """
+        labelId = self.index.remove(label)
+        if labelId is not None:
+            self.graph.deleteNode(labelId)
+
+    def insertEdge(self, tail, head, weight=None):
+        """
+        Add a new edge.
+        :param tail: the tail node label.
+        :param head: the head node label.
+        :param weight: the (optional) edge weight (floating-point).
+        :return: the result of the wrapped graph insertEdge.
+        """
+        ids = self._ids(tail, head)
+        return None if ids is None else self.graph.insertEdge(ids[0], ids[1], weight)
+
+    def deleteEdge(self, tail, head):
+        """
+        Remove the specified edge.
+        :param tail: the tail node label.
+        :param head: the head node label.
+        :return: void.
+        """
+        ids = self._ids(tail, head)
+        if ids is not None:
+            self.graph.deleteEdge(ids[0], ids[1])
+
+    def isAdj(self, tail, head):
+        """
+        Checks if two nodes ar adjacent.
+        :param tail: the tail node label.
+        :param head: the head node label.
+        :return: True, if the two nodes are adjacent; False, otherwise.
+        """
+        ids = self._ids(tail, head)
+        return ids is not None and self.graph.isAdj(ids[0], ids[1])
+
+    def getAdj(self, label):
+        """
+        Return the labels of all nodes adjacent to the one specified.
+        :param label: the node label.
+        :return: the list of labels, or None if the node does not exist.
+        """
+        ids = self._ids(label)
+        return None if ids is None else [self.index.label(i) for i in self.graph.getAdj(ids[0])]
+
+    def deg(self, label):
+        """
+        Return the node degree.
+        :param label: the node label.
+        :return: the node degree.
+        """
+        ids = self._ids(label)
+        return 0 if ids is None else self.graph.deg(ids[0])
+
+    def numNodes(self):
+        """
+        Return the number of nodes.
+        :return: the number of nodes.
+        """
+        return self.graph.numNodes()
+
+    def numEdges(self):
+        """
+        Return the number of edges.
+        :return: the number of edges.
+        """
+        return self.graph.numEdges()
+
+    def getEdges(self):
+        """
+        Return the list of edges, as (tail label, head label, weight).
+        :return: the list of edges.
+        """
+        return [(self.index.label(edge.tail), self.index.label(edge.head), edge.weight)
+                for edge in self.graph.getEdges()]
+
+    def toLabels(self, result, keys=True, values=True):
+        """
+        Translate a result of the wrapped graph to node labels. Only the
+        integers in the positions selected by keys and values are taken as
+        node IDs: the other ones (counters, distances, ...) must be excluded,
+        e.g. toLabels(eccentricities, values=False).
+        :param result: a node ID, or nested lists, tuples and dictionaries.
+        :param keys: if True, the keys of the dictionaries are node IDs.
+        :param values: if True, the items of the lists and tuples and the
+        values of the dictionaries are node IDs (or results to translate).
+        :return: the same result, with the node labels.
+        """
+        if isinstance(result, dict):
+            return {(self.toLabels(key) if keys else key):
+                    (self.toLabels(value, keys, values) if values else value)
+                    for key, value in result.items()}
+        if not values:
+            return result
+        if isinstance(result, (list, tuple)):
+            return type(result)(self.toLabels(item, keys, values) for item in result)
+        if isinstance(result, int) and not isinstance(result, bool):
+            return self.index.label(result)
+        return result
+
+    def bfs(self, label):
+        """
+        Execute a BFS starting from the specified node.
+        :param label: the root node label.
+        :return: the BFS list of node labels.
+        """
+        ids = self._ids(label)
+        return None if ids is None else self.toLabels(self.graph.bfs(ids[0]))
+
+    def dfs(self, label):
+        """
+        Execute a DFS starting from the specified node.
+        :param label: the root node label.
+        :return: the DFS list of node labels.
+        """
+        ids = self._ids(label)
+        return None if ids is None else self.toLabels(self.graph.dfs(ids[0]))
+
+    def mediumNode(self):
+        """
+        Return the medium nodes of the graph (see GraphBase.mediumNode), as
+        labels; the counters are left unchanged.
+        :return: the list of medium node labels.
+        """
+        return [self.index.label(nodeId) for nodeId in self.graph.mediumNode()]
+
+
+if __name__ == "__main__":
+    from graphFile.Graph_AdjacencyMatrix import GraphAdjacencyMatrix
+
+    graph = LabelledGraph(GraphAdjacencyMatrix(undirected=True))
+    graph.addNodes(["Roma", "Milano", "Napoli", "Torino", ("Bari", "BA")])
+    for tail, head in [("Roma", "Milano"), ("Roma", "Napoli"), ("Milano", "Torino"),
+                       ("Napoli", ("Bari", "BA"))]:
+        graph.insertEdge(tail, head)
+
+    print("Adjacent to Roma:", graph.getAdj("Roma"))
+    print("BFS from Torino:", graph.bfs("Torino"))
+    print("Medium nodes:", graph.mediumNode())
+    graph.deleteNode("Milano")
+    print("After removing Milano, BFS from Roma:", graph.bfs("Roma"))
+    print("ID of Torino (unchanged):", graph.index.id("Torino"))
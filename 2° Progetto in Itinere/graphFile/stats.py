@@ -0,0 +1,83 @@
+import time
+
+
+class GraphStats:
+    """
+    Counters collected by an instrumented graph (see GraphBase.enableStats):
+    wall time and number of calls per phase, getAdj calls, nodes and edges
+    touched, exploration-tree nodes allocated.
+    The phase times are inclusive: the time of findLeaf also contains the
+    time of the leafDistance calls it makes.
+    """
+
+    def __init__(self, callback=None):
+        """
+        Constructor.
+        :param callback: the (optional) function called as callback(phase,
+        elapsed) every time a phase ends, with the elapsed time in seconds.
+        """
+        self.callback = callback
+        self.reset()
+
+    def reset(self):
+        """
+        Set all the counters to zero.
+        :return: void.
+        """
+        self.phaseTime = {}  # {phase: total wall time in seconds}
+        self.phaseCalls = {}  # {phase: number of runs}
+        self.getAdjCalls = 0  # number of getAdj calls
+        self.touchedNodes = set()  # distinct nodes whose adjacency has been read
+        self.edgesTouched = 0  # adjacency entries returned by getAdj
+        self.treeNodes = 0  # exploration-tree nodes allocated, counted by the searches that build them
+
+    @property
+    def nodesTouched(self):
+        """
+        Return the number of distinct nodes whose adjacency has been read.
+        :return: the number of nodes.
+        """
+        return len(self.touchedNodes)
+
+    def addPhase(self, phase, elapsed):
+        """
+        Record a run of a phase.
+        :param phase: the phase name.
+        :param elapsed: the wall time of the run, in seconds.
+        :return: void.
+        """
+        self.phaseTime[phase] = self.phaseTime.get(phase, 0.0) + elapsed
+        self.phaseCalls[phase] = self.phaseCalls.get(phase, 0) + 1
+        if self.callback is not None:
+            self.callback(phase, elapsed)
+
+    def now(self):
+        """
+        Return the current time, to be used as start time of a phase.
+        :return: the current time, in seconds.
+        """
+        return time.perf_counter()
+
+    def endPhase(self, phase, start):
+        """
+        Record a run of a phase started at the specified time.
+        :param phase: the phase name.
+        :param start: the start time, as returned by now().
+        :return: void.
+        """
+        self.addPhase(phase, time.perf_counter() - start)
+
+    def __str__(self):
+        """
+        Returns the string representation of the counters.
+        :return: the string representation of the counters.
+        """
+        s = "Phases:\n"
+        for phase in sorted(self.phaseTime, key=self.phaseTime.get, reverse=True):
+            s += "{:>18}: {:10.6f} s in {} calls\n".format(
+                phase, self.phaseTime[phase], self.phaseCalls[phase])
+        s += "getAdj calls: {}\n".format(self.getAdjCalls)
+        s += "Nodes touched: {}\n".format(self.nodesTouched)
+        s += "Edges touched: {}\n".format(self.edgesTouched)
+        s += "Tree nodes allocated: {}".format(self.treeNodes)
+        return s
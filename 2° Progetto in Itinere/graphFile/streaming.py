@@ -0,0 +1,112 @@
+from array import array
+
+
+def forestCenters(edges, numNodes=0):
+    """
+    Compute the center(s) of every tree of a forest given as a stream of
+    undirected edges, without building the adjacency structure.
+    For each node only the degree, the XOR of the IDs of its neighbours and
+    the size of the peeled subtree are stored: when a leaf v is peeled, its
+    only remaining neighbour is xor[v]. The leaves are peeled layer by layer
+    until the center (or the two centers) of each tree remains.
+    Nodes lying on a cycle are never peeled and they are not reported.
+    ---
+    Time Complexity: O(|V|+|E|)
+    Memory Complexity: O(|V|), 16 bytes per node
+    :param edges: iterable of (tail, head) or (tail, head, weight) tuples,
+    each undirected edge given once; node IDs are non-negative integers.
+    :param numNodes: the (optional) expected number of nodes, used to
+    preallocate the arrays.
+    :return: a list with an entry [centers, layers, nodeList] for each tree
+    with at least one edge, where layers is the number of peeled layers (the
+    eccentricity of the centers) and nodeList is the result backToFather
+    gives on a longest path of the tree: [[medium nodes], counter], or 0 if
+    the longest path has less than three nodes.
+    """
+    deg = array('i', bytes(4 * numNodes))
+    xor = array('q', bytes(8 * numNodes))
+
+    # read the stream once, keeping only degrees and XOR of the neighbours
+    for edge in edges:
+        tail, head = edge[0], edge[1]
+        if max(tail, head) >= len(deg):
+            missing = max(tail, head) + 1 - len(deg)
+            deg.frombytes(bytes(4 * missing))
+            xor.frombytes(bytes(8 * missing))
+        deg[tail] += 1
+        deg[head] += 1
+        xor[tail] ^= head
+        xor[head] ^= tail
+
+    size = array('i', [1]) * len(deg)  # nodes of the subtree peeled into each node
+    inLayer = bytearray(len(deg))  # 1 if the node is a leaf of the current layer
+    current = array('q', (nodeId for nodeId in range(len(deg)) if deg[nodeId] == 1))
+    results = []
+    layer = 0
+
+    while len(current) > 0:
+        for leaf in current:
+            inLayer[leaf] = 1
+        nextLayer = array('q')
+
+        for leaf in current:
+            if deg[leaf] != 1:  # already peeled as the other center
+                continue
+            father = xor[leaf]
+            deg[leaf] = 0
+            deg[father] -= 1
+            xor[father] ^= leaf
+
+            if deg[father] == 0 and inLayer[father]:
+                # two adjacent leaves of the same layer: the tree has two centers
+                results.append([[leaf, father], layer + 1,
+                                _bicentralInfo(leaf, father, size, layer)])
+                continue
+
+            size[father] += size[leaf]
+            if deg[father] == 0:
+                # all the neighbours have been peeled: the tree has one center
+                results.append([[father], layer + 1, [[father], layer + 1]])
+            elif deg[father] == 1:
+                nextLayer.append(father)
+
+        for leaf in current:
+            inLayer[leaf] = 0
+        current = nextLayer
+        layer += 1
+
+    return results
+
+
+def _bicentralInfo(first, second, size, layer):
+    """
+    Return the medium node(s) of a tree with two centers, choosing the
+    center with the largest subtree as backToFather does.
+    :param first: the first center.
+    :param second: the second center.
+    :param size: the sizes of the subtrees peeled into each node.
+    :param layer: the layer (starting from 0) of the two centers.
+    :return: [[medium nodes], counter], or 0 if the tree is a single edge.
+    """
+    if layer == 0:  # longest path with two nodes only
+        return 0
+
+    # the counters exclude the center itself, like calculateSubNode
+    firstCount = size[first] - 1
+    secondCount = size[second] - 1
+    if firstCount > secondCount:
+        return [[first], firstCount]
+    elif secondCount > firstCount:
+        return [[second], secondCount]
+    return [[first, second], firstCount]
+
+
+if __name__ == "__main__":
+    # path 0-1-2-3-4 (one center), path 5-6-7-8-9 with a leaf 13 on 7,
+    # single edge 10-11 (two centers), star centered in 12
+    forest = [(0, 1), (1, 2), (2, 3), (3, 4),
+              (5, 6), (6, 7), (7, 8), (8, 9), (7, 13),
+              (10, 11),
+              (12, 14), (12, 15), (12, 16)]
+    for centers, layers, nodeList in forestCenters(forest):
+        print("Centers: {}, layers: {}, medium nodes: {}".format(centers, layers, nodeList))
@@ -2,6 +2,7 @@ from list import LinkedList
 
 
 class DoubleRecord(LinkedList.Record):
+    __slots__ = ('prev',)
 
     def __init__(self, elem):
         LinkedList.Record.__init__(self, elem)
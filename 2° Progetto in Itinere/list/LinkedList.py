@@ -1,4 +1,6 @@
 class Record:
+    __slots__ = ('elem', 'next')
+
     def __init__(self, elem):
         self.elem = elem
         self.next = None
@@ -0,0 +1,251 @@
+"""
+    File name: sweepRunner.py
+    Python Version: 3.6.3
+
+    Questo modulo esegue una campagna di esperimenti (sweep) sui grafi generati da demoAlgoritmo.py.
+    La campagna è descritta da un file JSON, ad esempio:
+
+        {
+            "generators": ["random", "best", "worst"],
+            "sizes": [1000, 10000],
+            "backends": ["AdjacencyList", "IncidenceList"],
+            "seeds": [1, 2, 3],
+            "algorithms": ["mediumNode", "median"],
+            "timeout": 600,
+            "memory": 2048,
+            "workers": 8
+        }
+
+    Ogni cella (generatore, dimensione, struttura dati, seme, algoritmo) è eseguita in un processo separato, con al
+    più "workers" processi contemporanei, un tempo massimo di "timeout" secondi ed un limite di "memory" MB di spazio
+    di indirizzamento. I risultati sono scritti, appena disponibili, come una riga JSON per cella; rilanciando il
+    programma sullo stesso file di output le celle già presenti non vengono rieseguite.
+
+    Uso: python sweepRunner.py campagna.json risultati.jsonl [--workers N]
+
+    Nota: il pacchetto locale "queue" nasconde quello della libreria standard, quindi non è possibile usare
+    multiprocessing.Pool; i processi sono gestiti direttamente, comunicando tramite Pipe.
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from multiprocessing.connection import wait
+
+import demoAlgoritmo
+from graphFile.Graph_AdjacencyList import GraphAdjacencyList
+from graphFile.Graph_AdjacencyMatrix import GraphAdjacencyMatrix
+from graphFile.Graph_IncidenceList import GraphIncidenceList
+
+# Generatori dei grafi: funzione (numero di nodi, struttura dati) -> grafo
+GENERATORI = {
+    "random": demoAlgoritmo.createRandomGraph,
+    "best": demoAlgoritmo.createBestGraph,
+    "worst": demoAlgoritmo.createWorstGraph,
+    "pari": lambda numNodes, strutturaDati: demoAlgoritmo.createRelationGraphPari(strutturaDati),
+    "dispari": lambda numNodes, strutturaDati: demoAlgoritmo.createRelationGraphDispari(strutturaDati),
+}
+
+# Strutture dati: "CSR" costruisce il grafo con le liste di adiacenza e ne usa la copia in sola lettura
+STRUTTURE = {
+    "AdjacencyList": GraphAdjacencyList,
+    "AdjacencyMatrix": GraphAdjacencyMatrix,
+    "IncidenceList": GraphIncidenceList,
+    "CSR": GraphAdjacencyList,
+}
+
+# Algoritmi: funzione grafo -> risultato (serializzabile in JSON)
+ALGORITMI = {
+    "mediumNode": lambda graph: graph.mediumNode(),
+    "mediumNodeDedup": lambda graph: graph.mediumNode(dedup=True),
+    "median": lambda graph: graph.median(),
+    "eccentricities": lambda graph: graph.eccentricities(),
+    "approxCenter": lambda graph: graph.approxCenter(),
+    "bfs": lambda graph: graph.bfs(next(iter(graph.nodes))),
+    "dfs": lambda graph: graph.dfs(next(iter(graph.nodes))),
+}
+
+CAMPI = ("generator", "size", "backend", "seed", "algorithm")
+
+
+def creaCelle(campagna):
+    """
+    Questa funzione restituisce la lista delle celle della campagna (prodotto cartesiano dei parametri)
+
+    :param campagna: dizionario con la descrizione della campagna
+    :return: lista di dizionari, uno per cella
+    """
+    for campo, nomi in (("generators", GENERATORI), ("backends", STRUTTURE), ("algorithms", ALGORITMI)):
+        for nome in campagna[campo]:
+            if nome not in nomi:
+                raise Exception("Error: unknown {} {}!".format(campo[:-1], nome))
+
+    valori = [campagna["generators"], campagna.get("sizes", [0]), campagna["backends"],
+              campagna.get("seeds", [0]), campagna["algorithms"]]
+    return [dict(zip(CAMPI, cella)) for cella in itertools.product(*valori)]
+
+
+def chiaveCella(cella):
+    """
+    Questa funzione restituisce la chiave che identifica una cella nel file dei risultati
+
+    :param cella: dizionario della cella (o riga dei risultati)
+    :return: tupla con i parametri della cella
+    """
+    return tuple(cella[campo] for campo in CAMPI)
+
+
+def celleCompletate(output):
+    """
+    Questa funzione legge i risultati già scritti, per riprendere una campagna interrotta.
+    Le righe non valide sono saltate senza interrompere la lettura; solo l'ultima riga, se incompleta (interruzione
+    durante la scrittura, quindi senza "\n" finale), viene troncata, perché le nuove righe vi sarebbero accodate.
+
+    :param output: percorso del file dei risultati
+    :return: insieme delle chiavi delle celle già eseguite
+    """
+    completate = set()
+    if not os.path.exists(output):
+        return completate
+
+    validi = 0  # Byte del file fino all'ultima riga terminata da "\n"
+    with open(output, "rb") as file:
+        for riga in file:
+            if not riga.endswith(b"\n"):
+                break  # Solo l'ultima riga può essere priva di "\n"
+            validi += len(riga)
+            try:
+                completate.add(chiaveCella(json.loads(riga.decode("utf-8"))))
+            except (ValueError, KeyError, TypeError):
+                continue  # Riga non valida: la cella sarà eseguita di nuovo
+
+    if validi < os.path.getsize(output):
+        with open(output, "r+b") as file:
+            file.truncate(validi)
+    return completate
+
+
+def eseguiCella(cella, memoria, connection):
+    """
+    Questa funzione, eseguita nel processo figlio, costruisce il grafo della cella, esegue l'algoritmo e invia il
+    risultato al processo padre
+
+    :param cella: dizionario della cella
+    :param memoria: limite di memoria in MB (None se non è previsto)
+    :param connection: estremo della Pipe verso il processo padre
+    """
+    if memoria is not None:
+        import resource
+        limite = int(memoria) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limite, limite))
+
+    risultato = dict(cella)
+    try:
+        random.seed(cella["seed"])
+        inizio = time.perf_counter()
+        graph = GENERATORI[cella["generator"]](cella["size"], STRUTTURE[cella["backend"]])
+        if cella["backend"] == "CSR":
+            graph = graph.freeze()
+        risultato["buildTime"] = time.perf_counter() - inizio
+        risultato["nodes"] = graph.numNodes()
+        risultato["edges"] = graph.numEdges()
+
+        inizio = time.perf_counter()
+        valore = ALGORITMI[cella["algorithm"]](graph)
+        risultato["time"] = time.perf_counter() - inizio
+        risultato["status"] = "ok"
+        risultato["result"] = valore
+    except MemoryError:
+        risultato["status"] = "memory"
+    except Exception as errore:
+        risultato["status"] = "error"
+        risultato["error"] = repr(errore)
+
+    connection.send(json.dumps(risultato, default=str))
+    connection.close()
+
+
+def eseguiCampagna(campagna, output, workers=None):
+    """
+    Questa funzione esegue tutte le celle della campagna non ancora presenti nel file dei risultati, scrivendo una
+    riga JSON per ogni cella terminata (anche per timeout, errore o memoria esaurita)
+
+    :param campagna: dizionario con la descrizione della campagna
+    :param output: percorso del file dei risultati (JSON Lines)
+    :param workers: numero massimo di processi contemporanei (di default quello della campagna o il numero di CPU)
+    :return: numero di celle eseguite
+    """
+    completate = celleCompletate(output)
+    daEseguire = [cella for cella in creaCelle(campagna) if chiaveCella(cella) not in completate]
+    daEseguire.reverse()  # Le celle sono estratte dalla fine della lista
+
+    if workers is None:
+        workers = campagna.get("workers", os.cpu_count() or 1)
+    timeout = campagna.get("timeout")
+    memoria = campagna.get("memory")
+    inEsecuzione = {}  # {connection: [cella, processo, scadenza]}
+    eseguite = 0
+
+    with open(output, "a", encoding="utf-8") as file:
+
+        def scrivi(riga):
+            file.write(riga + "\n")
+            file.flush()
+
+        while len(daEseguire) > 0 or len(inEsecuzione) > 0:
+            # Avvio nuovi processi fino al numero massimo
+            while len(daEseguire) > 0 and len(inEsecuzione) < workers:
+                cella = daEseguire.pop()
+                padre, figlio = multiprocessing.Pipe(duplex=False)
+                processo = multiprocessing.Process(target=eseguiCella, args=(cella, memoria, figlio))
+                processo.start()
+                figlio.close()
+                scadenza = None if timeout is None else time.monotonic() + timeout
+                inEsecuzione[padre] = [cella, processo, scadenza]
+
+            # Attendo un risultato, la terminazione di un processo o la prima scadenza
+            scadenze = [s for _, _, s in inEsecuzione.values() if s is not None]
+            attesa = None if len(scadenze) == 0 else max(0, min(scadenze) - time.monotonic())
+            pronti = wait(list(inEsecuzione), attesa)
+
+            for connection in pronti:
+                cella, processo, _ = inEsecuzione.pop(connection)
+                try:
+                    scrivi(connection.recv())
+                except EOFError:  # Il processo è terminato senza inviare il risultato
+                    processo.join()
+                    riga = dict(cella, status="crashed", exitcode=processo.exitcode)
+                    scrivi(json.dumps(riga))
+                connection.close()
+                processo.join()
+                eseguite += 1
+
+            adesso = time.monotonic()
+            for connection, (cella, processo, scadenza) in list(inEsecuzione.items()):
+                if scadenza is not None and adesso >= scadenza:
+                    processo.terminate()
+                    processo.join()
+                    connection.close()
+                    del inEsecuzione[connection]
+                    scrivi(json.dumps(dict(cella, status="timeout", time=timeout)))
+                    eseguite += 1
+
+    return eseguite
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Esegue una campagna di esperimenti sui grafi.")
+    parser.add_argument("campagna", help="file JSON con la descrizione della campagna")
+    parser.add_argument("output", help="file JSON Lines dei risultati (ripreso se esiste)")
+    parser.add_argument("--workers", type=int, default=None, help="numero massimo di processi contemporanei")
+    argomenti = parser.parse_args()
+
+    with open(argomenti.campagna, encoding="utf-8") as file:
+        campagna = json.load(file)
+    inizio = time.perf_counter()
+    eseguite = eseguiCampagna(campagna, argomenti.output, argomenti.workers)
+    print("Celle eseguite: {} in {:.1f} s".format(eseguite, time.perf_counter() - inizio))
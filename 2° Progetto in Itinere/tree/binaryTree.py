@@ -6,6 +6,8 @@ else:
     from queue.Queue import CodaArrayList_deque
 
 class BinaryNode:
+    __slots__ = ('info', 'father', 'leftSon', 'rightSon')
+
     def __init__(self, info):
         self.info = info
         self.father = None
@@ -2,6 +2,8 @@ from stack.Stack import PilaArrayList
 from queue.Queue import CodaArrayList_deque
 
 class TreeArrayListNode:
+    __slots__ = ('info', 'father', 'distanza', 'sons')
+
     def __init__(self, info, distanza = 0, medium = 0):
         self.info = info
         self.father = None
@@ -0,0 +1,201 @@
+from tree.treeArrayList import TreeArrayList
+
+
+class TreeIndex:
+    """
+    Binary lifting index of a tree (or of a forest) of TreeArrayListNode,
+    such as the exploration trees returned by genericSearch.
+    Once built, it answers lowest common ancestor, distance, k-th ancestor
+    and path middle queries without walking the father pointers.
+    ---
+    Build Time Complexity: O(n log n)
+    Query Time Complexity: O(log n)
+    Memory Complexity: O(n log n)
+    """
+
+    def __init__(self, trees):
+        """
+        Constructor.
+        :param trees: a TreeArrayList, a root TreeArrayListNode, or a list of
+        them (a forest). The info of the nodes must be distinct.
+        """
+        if isinstance(trees, (list, tuple)):
+            roots = [t.root if isinstance(t, TreeArrayList) else t for t in trees]
+        else:
+            roots = [trees.root if isinstance(trees, TreeArrayList) else trees]
+
+        self.index = {}  # {info: position}
+        self.infos = []  # position -> info
+        self.depth = []  # position -> depth
+        self.treeOf = []  # position -> position of the root of its tree
+        father = []  # position -> position of the father (the root is its own father)
+
+        # iterative visit: the fathers are always indexed before their sons
+        for root in roots:
+            if root is None:
+                continue
+            rootPos = len(self.infos)
+            stack = [(root, rootPos)]
+            while len(stack) > 0:
+                node, fatherPos = stack.pop()
+                pos = len(self.infos)
+                self.index[node.info] = pos
+                self.infos.append(node.info)
+                father.append(fatherPos)
+                self.depth.append(0 if pos == fatherPos else self.depth[fatherPos] + 1)
+                self.treeOf.append(rootPos)
+                for son in node.sons:
+                    stack.append((son, pos))
+
+        # up[k][i] is the 2^k-th ancestor of i (the root, if it does not exist)
+        levels = max(1, max(self.depth, default=0).bit_length())
+        self.up = [father]
+        for k in range(1, levels):
+            previous = self.up[k - 1]
+            self.up.append([previous[previous[i]] for i in range(len(previous))])
+
+    def __len__(self):
+        """
+        Return the number of indexed nodes.
+        :return: the number of nodes.
+        """
+        return len(self.infos)
+
+    def _ancestor(self, pos, k):
+        """
+        Return the position of the k-th ancestor of a position.
+        :param pos: the node position.
+        :param k: the number of steps towards the root (at most its depth).
+        :return: the position of the ancestor.
+        """
+        level = 0
+        while k > 0:
+            if k & 1:
+                pos = self.up[level][pos]
+            k >>= 1
+            level += 1
+        return pos
+
+    def _lca(self, first, second):
+        """
+        Return the position of the lowest common ancestor of two positions
+        of the same tree.
+        :param first: the first node position.
+        :param second: the second node position.
+        :return: the position of the lowest common ancestor.
+        """
+        if self.depth[first] < self.depth[second]:
+            first, second = second, first
+        first = self._ancestor(first, self.depth[first] - self.depth[second])
+        if first == second:
+            return first
+        for level in range(len(self.up) - 1, -1, -1):
+            if self.up[level][first] != self.up[level][second]:
+                first = self.up[level][first]
+                second = self.up[level][second]
+        return self.up[0][first]
+
+    def _positions(self, u, v):
+        """
+        Return the positions of two nodes, if they belong to the same tree.
+        :param u: the info of the first node.
+        :param v: the info of the second node.
+        :return: the pair of positions; None, otherwise.
+        """
+        if u not in self.index or v not in self.index:
+            return None
+        first, second = self.index[u], self.index[v]
+        if self.treeOf[first] != self.treeOf[second]:
+            return None
+        return first, second
+
+    def lca(self, u, v):
+        """
+        Return the lowest common ancestor of two nodes.
+        :param u: the info of the first node.
+        :param v: the info of the second node.
+        :return: the info of the lowest common ancestor, if the nodes are in
+        the same tree; None, otherwise.
+        """
+        positions = self._positions(u, v)
+        if positions is None:
+            return None
+        return self.infos[self._lca(*positions)]
+
+    def distance(self, u, v):
+        """
+        Return the number of edges of the path between two nodes.
+        :param u: the info of the first node.
+        :param v: the info of the second node.
+        :return: the distance, if the nodes are in the same tree; None, otherwise.
+        """
+        positions = self._positions(u, v)
+        if positions is None:
+            return None
+        first, second = positions
+        return self.depth[first] + self.depth[second] - 2 * self.depth[self._lca(first, second)]
+
+    def kthAncestor(self, u, k):
+        """
+        Return the k-th ancestor of a node (the father is the 1st ancestor).
+        :param u: the info of the node.
+        :param k: the number of steps towards the root.
+        :return: the info of the ancestor, if exists; None, otherwise.
+        """
+        if u not in self.index or k < 0 or k > self.depth[self.index[u]]:
+            return None
+        return self.infos[self._ancestor(self.index[u], k)]
+
+    def nodeOnPath(self, u, v, i):
+        """
+        Return the i-th node of the path from u to v (u is the 0-th node).
+        :param u: the info of the first node.
+        :param v: the info of the last node.
+        :param i: the position of the node along the path.
+        :return: the info of the node, if exists; None, otherwise.
+        """
+        positions = self._positions(u, v)
+        if positions is None:
+            return None
+        first, second = positions
+        lca = self._lca(first, second)
+        up = self.depth[first] - self.depth[lca]  # steps from u to the lca
+        length = up + self.depth[second] - self.depth[lca]
+        if i < 0 or i > length:
+            return None
+        if i <= up:
+            return self.infos[self._ancestor(first, i)]
+        return self.infos[self._ancestor(second, length - i)]
+
+    def pathMiddle(self, u, v):
+        """
+        Return the middle node(s) of the path between two nodes: one node if
+        the path has an odd number of nodes; two nodes, otherwise.
+        :param u: the info of the first node.
+        :param v: the info of the last node.
+        :return: the list of middle nodes, if the nodes are in the same tree;
+        None, otherwise.
+        """
+        length = self.distance(u, v)
+        if length is None:
+            return None
+        if length % 2 == 0:
+            return [self.nodeOnPath(u, v, length // 2)]
+        return [self.nodeOnPath(u, v, length // 2), self.nodeOnPath(u, v, length // 2 + 1)]
+
+
+if __name__ == "__main__":
+    from tree.treeArrayList import TreeArrayListNode
+
+    # chain 0-1-2-3-4-5 with a branch 2-6-7
+    nodes = [TreeArrayListNode(i) for i in range(8)]
+    for father, son in [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (2, 6), (6, 7)]:
+        nodes[son].father = nodes[father]
+        nodes[father].sons.append(nodes[son])
+    index = TreeIndex(TreeArrayList(nodes[0]))
+
+    print("lca(5,7):", index.lca(5, 7))
+    print("distance(5,7):", index.distance(5, 7))
+    print("kthAncestor(5,3):", index.kthAncestor(5, 3))
+    print("pathMiddle(5,7):", index.pathMiddle(5, 7))
+    print("pathMiddle(0,5):", index.pathMiddle(0, 5))
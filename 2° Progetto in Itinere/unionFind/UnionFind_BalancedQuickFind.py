@@ -1,6 +1,8 @@
 from unionFind.UnionFind_QuickFind import UnionFindNode, UnionFindQuickFind
 
 class UnionFindNodeBalanced(UnionFindNode):
+    __slots__ = ('size',)
+
     def __init__(self, e):
         super().__init__(e)  #con python < 3 usare: 
                              #super(UnionFindBalancedNode,self).__init__(e)
@@ -1,5 +1,7 @@
 class UnionFindNode:
     """Nodo di una struttura dati union-find."""
+    __slots__ = ('elem', 'father', 'sons')
+
     def __init__(self, e):
         self.elem = e
         self.father = None